@@ -4,7 +4,9 @@
 This sample demonstrates a simple pagination using a CSV file as the data source.
 """
 import csv
-from typing import List, Tuple
+from typing import Callable, List, Mapping, Sequence, Tuple
+
+from dataset_query import QueryIndex
 
 
 def index_range(page: int, page_size: int) -> Tuple[int, int]:
@@ -31,12 +33,22 @@ class Server:
     """
     DATA_FILE = "Popular_Baby_Names.csv"
 
-    def __init__(self):
+    def __init__(self, loader: Callable[[str], Sequence[List]] = None):
         """Initialize the Server object.
 
         The dataset is initially set to None, and is loaded from the CSV file on demand.
+
+        Args:
+            loader (Callable[[str], Sequence[List]], optional): A callable that
+                takes the path of the CSV file and returns a list-like view of
+                its rows without the header, such as ``MappedDataset``, or
+                ``WatchedDataset`` to follow changes to the file. Defaults
+                to reading the whole file into memory.
         """
         self.__dataset = None
+        self.__loader = loader
+        self.__query_index = None
+        self.__generation = 0
 
     def dataset(self) -> List[List]:
         """Get the dataset from memory.
@@ -46,20 +58,64 @@ class Server:
         Returns:
             List[List]: The dataset read from the CSV file.
         """
+        if self.__dataset is None and self.__loader is not None:
+            self.__dataset = self.__loader(self.DATA_FILE)
         if self.__dataset is None:
             with open(self.DATA_FILE) as f:
                 reader = csv.reader(f)
                 dataset = [row for row in reader]
             self.__dataset = dataset[1:]
 
+        if hasattr(self.__dataset, "snapshot"):
+            return self._follow(self.__dataset)
         return self.__dataset
 
-    def get_page(self, page: int = 1, page_size: int = 10) -> List[List]:
+    def _follow(self, source) -> List[List]:
+        """Take a snapshot of a hot-reloading dataset and catch up with it.
+
+        When the source changed, the query index is extended with the
+        appended rows, or dropped if the file was reloaded from scratch.
+
+        Args:
+            source: A dataset with ``snapshot()`` and generations, such as
+                ``WatchedDataset``.
+
+        Returns:
+            List[List]: The rows of the snapshot.
+        """
+        rows = source.snapshot()
+        generation = source.generation
+        if generation != self.__generation:
+            if self.__query_index is not None:
+                if source.rewritten <= self.__generation:
+                    self.__query_index.extend(rows)
+                else:
+                    self.__query_index = None
+            self.__generation = generation
+        return rows
+
+    def query_index(self) -> QueryIndex:
+        """Get the filtering and sorting indexes, built on first use.
+
+        Returns:
+            QueryIndex: The indexes over the dataset.
+        """
+        dataset = self.dataset()
+        if self.__query_index is None:
+            self.__query_index = QueryIndex(dataset)
+        return self.__query_index
+
+    def get_page(self, page: int = 1, page_size: int = 10,
+                 where: Mapping = None, order_by: str = None) -> List[List]:
         """Get a page of data from the dataset.
 
         Args:
             page (int, optional): The page number to retrieve. Defaults to 1.
             page_size (int, optional): The number of items per page. Defaults to 10.
+            where (Mapping, optional): Only keep the rows having these
+                values, e.g. ``{"Gender": "FEMALE", "Year": 2016}``.
+            order_by (str, optional): Sort the rows on ``Count`` or
+                ``Rank``, descending when prefixed with ``-``.
 
         Returns:
             List[List]: The page of data from the dataset.
@@ -67,7 +123,6 @@ class Server:
         assert type(page) == int and type(page_size) == int
         assert page > 0 and page_size > 0
         start, end = index_range(page, page_size)
-        data = self.dataset()
-        if start > len(data):
-            return []
-        return data[start:end]
+        if where or order_by is not None:
+            return self.query_index().rows(where, order_by, start, end)
+        return self.dataset()[start:end]
@@ -7,7 +7,15 @@ This module provides functionality for paginating a dataset of popular baby name
 
 import csv
 import math
-from typing import List
+from types import MappingProxyType
+from typing import (Callable, Dict, Iterator, List, Mapping, Optional,
+                    Sequence, Tuple)
+
+from dataset_query import QueryIndex
+from page_cursor import decode_cursor, encode_cursor
+from page_payload import EncodedPage, PayloadCache, dataset_tag, make_etag
+
+CHUNK = 1024
 
 def index_range(page: int, page_size: int) -> tuple:
     """
@@ -29,11 +37,34 @@ class Server:
     
     DATA_FILE = "Popular_Baby_Names.csv"
 
-    def __init__(self):
+    def __init__(self, loader: Callable[[str], Sequence[List]] = None,
+                 page_cache=None, payload_cache: PayloadCache = None):
         """
         Initialize the Server instance.
+
+        Args:
+            loader (Callable[[str], Sequence[List]], optional): A callable
+                that takes the CSV path and returns a list-like view of the
+                rows without the header, such as ``MappedDataset``, or
+                ``WatchedDataset`` to follow changes to the file.
+                Defaults to reading the whole file into memory.
+            page_cache (optional): A cache with ``get``/``put`` methods,
+                such as ``LRUCache(capacity=256)`` from 0x01-caching, used
+                to keep ``get_hyper`` responses. Defaults to no caching.
+            payload_cache (PayloadCache, optional): Where to keep the JSON
+                bytes of ``get_hyper_encoded``. Defaults to a cache of 256
+                responses.
         """
         self.__dataset = None
+        self.__loader = loader
+        self.__page_cache = page_cache
+        self.__version = 0
+        self.__total_pages: Dict[int, int] = {}
+        self.__query_index = None
+        self.__generation = 0
+        self.__tag = None
+        self.__payloads = (PayloadCache() if payload_cache is None
+                           else payload_cache)
 
     def dataset(self) -> List[List]:
         """
@@ -42,20 +73,116 @@ class Server:
         Returns:
             List[List]: The dataset as a list of lists.
         """
+        if self.__dataset is None:
+            self.__tag = dataset_tag(self.DATA_FILE)
+        if self.__dataset is None and self.__loader is not None:
+            self.__dataset = self.__loader(self.DATA_FILE)
         if self.__dataset is None:
             with open(self.DATA_FILE) as f:
                 reader = csv.reader(f)
                 dataset = [row for row in reader]
             self.__dataset = dataset[1:]  # Exclude header
+        if hasattr(self.__dataset, "snapshot"):
+            return self._follow(self.__dataset)
         return self.__dataset
 
-    def get_page(self, page: int = 1, page_size: int = 10) -> List[List]:
+    def _follow(self, source) -> List[List]:
+        """
+        Take a snapshot of a hot-reloading dataset and catch up with it.
+
+        When the source changed, cached pages and page counts are dropped
+        as with ``reload``, and the query index is extended with the
+        appended rows, or dropped if the file was reloaded from scratch.
+
+        Args:
+            source: A dataset with ``snapshot()`` and generations, such as
+                ``WatchedDataset``.
+
+        Returns:
+            List[List]: The rows of the snapshot.
+        """
+        rows = source.snapshot()
+        generation = source.generation
+        if generation != self.__generation:
+            if self.__query_index is not None:
+                if source.rewritten <= self.__generation:
+                    self.__query_index.extend(rows)
+                else:
+                    self.__query_index = None
+            self.__version += 1
+            self.__total_pages = {}
+            self.__generation = generation
+            self.__tag = dataset_tag(self.DATA_FILE)
+        return rows
+
+    def _loading(self) -> bool:
+        """
+        Tell whether the dataset is still being loaded in the background.
+
+        Returns:
+            bool: True for a ``StreamingDataset`` that is not done yet.
+        """
+        return not getattr(self.dataset(), "done", True)
+
+    def reload(self) -> None:
+        """
+        Drop the loaded dataset so that the next call reads it again.
+
+        Cached pages and page counts belong to the previous version of the
+        dataset and are never returned after a reload.
+        """
+        self.__dataset = None
+        self.__version += 1
+        self.__total_pages = {}
+        self.__query_index = None
+
+    def query_index(self) -> QueryIndex:
+        """
+        Get the filtering and sorting indexes, built on first use.
+
+        Returns:
+            QueryIndex: The indexes over the dataset.
+        """
+        dataset = self.dataset()
+        if self.__query_index is None:
+            self.__query_index = QueryIndex(dataset)
+        return self.__query_index
+
+    def total_pages(self, page_size: int, where: Mapping = None,
+                    order_by: str = None) -> int:
+        """
+        Get the number of pages of the dataset, computed once per page size.
+
+        Args:
+            page_size (int): The number of items per page.
+            where (Mapping, optional): Only count the rows having these
+                values.
+            order_by (str, optional): The sort order of the result set.
+
+        Returns:
+            int: The number of pages.
+        """
+        if where:
+            count = self.query_index().count(where, order_by)
+            return math.ceil(count / page_size)
+        total = self.__total_pages.get(page_size)
+        if total is None:
+            total = math.ceil(len(self.dataset()) / page_size)
+            self.__total_pages[page_size] = total
+        return total
+
+    def get_page(self, page: int = 1, page_size: int = 10,
+                 where: Mapping = None, order_by: str = None) -> List[List]:
         """
         Get a page of data from the dataset.
         
         Args:
             page (int): The page number, starting from 1.
             page_size (int): The number of items per page.
+            where (Mapping, optional): Only keep the rows having these
+                values, e.g. ``{"Gender": "FEMALE", "Year": 2016}``.
+            order_by (str, optional): Sort the rows on ``Count`` or
+                ``Rank``, descending when prefixed with ``-``.
 
         Returns:
             List[List]: A list of data for the specified page.
@@ -64,33 +191,158 @@ class Server:
         assert type(page_size) is int and page_size > 0
 
         start, end = index_range(page, page_size)
+        if where or order_by is not None:
+            return self.query_index().rows(where, order_by, start, end)
         try:
             data = self.dataset()
             return data[start:end]
         except IndexError:
             return []
 
-    def get_hyper(self, page: int = 1, page_size: int = 10) -> dict:
+    def iter_rows(self, start_index: int = 0) -> Iterator[List]:
+        """
+        Stream the rows of the dataset from ``start_index`` to the end.
+
+        Rows are read in slices of ``CHUNK`` rows, so lazy datasets decode
+        them in batches, and a ``StreamingDataset`` is read as it loads.
+
+        Args:
+            start_index (int): The position of the first row.
+
+        Yields:
+            List: Each row, in order.
+        """
+        assert type(start_index) is int and start_index >= 0
+        data = self.dataset()
+        first = start_index
+        while True:
+            rows = data[first:first + CHUNK]
+            if not rows:
+                return
+            yield from rows
+            first += CHUNK
+
+    def iter_pages(self, page_size: int = 10, cursor: Optional[str] = None
+                   ) -> Iterator[Tuple[List[List], Optional[str]]]:
+        """
+        Stream the dataset page by page, without per-page metadata.
+
+        Args:
+            page_size (int): The number of items per page.
+            cursor (str, optional): A cursor yielded by an earlier stream,
+                to resume after the page it came with. Defaults to the
+                first page.
+
+        Yields:
+            Tuple[List[List], Optional[str]]: Each page, and the cursor of
+                the page after it, or None after the last page.
+        """
+        assert type(page_size) is int and page_size > 0
+        data = self.dataset()
+        size = len(data)
+        start = 0 if cursor is None else decode_cursor(cursor)
+        for first in range(start, size, page_size):
+            end = first + page_size
+            yield data[first:end], encode_cursor(end) if end < size else None
+
+    def get_hyper(self, page: int = 1, page_size: int = 10,
+                  where: Mapping = None, order_by: str = None) -> Mapping:
         """
         Get a dictionary containing pagination information.
+
+        With a page cache, the response is a read-only mapping whose rows
+        are tuples, so the same object can be shared by every caller.
+        The metadata describes the filtered result set when ``where`` is
+        given. While a ``StreamingDataset`` is still loading, an
+        unfiltered page does not wait for the whole file: ``total_pages``
+        is None, ``next_page`` tells whether a row follows the page, and
+        the response is not cached.
         
         Args:
             page (int): The page number, starting from 1.
             page_size (int): The number of items per page.
+            where (Mapping, optional): Only keep the rows having these
+                values.
+            order_by (str, optional): Sort the rows on ``Count`` or
+                ``Rank``, descending when prefixed with ``-``.
 
         Returns:
-            dict: A dictionary containing pagination metadata and data.
+            Mapping: A dictionary containing pagination metadata and data.
         """
-        data = self.get_page(page, page_size)
-        total_pages = math.ceil(len(self.dataset()) / page_size)
-        next_page = page + 1 if page < total_pages else None
+        page_cache = self.__page_cache
+        if page_cache is not None:
+            self.dataset()  # Catch up with a watched dataset first
+            key = (self.__version, page, page_size,
+                   QueryIndex.normalize(where, order_by))
+            payload = page_cache.get(key)
+            if payload is not None:
+                return payload
+
+        data = self.get_page(page, page_size, where, order_by)
+        if not where and self._loading():
+            end = page * page_size
+            total_pages = None
+            next_page = page + 1 if self.dataset()[end:end + 1] else None
+        else:
+            total_pages = self.total_pages(page_size, where, order_by)
+            next_page = page + 1 if page < total_pages else None
         prev_page = page - 1 if page > 1 else None
 
-        return {
+        if page_cache is None or total_pages is None:
+            return {
+                "page_size": len(data),
+                "page": page,
+                "data": data,
+                "next_page": next_page,
+                "prev_page": prev_page,
+                "total_pages": total_pages
+            }
+
+        payload = MappingProxyType({
             "page_size": len(data),
             "page": page,
-            "data": data,
+            "data": tuple(tuple(row) for row in data),
             "next_page": next_page,
             "prev_page": prev_page,
             "total_pages": total_pages
-        }
+        })
+        page_cache.put(key, payload)
+        return payload
+
+    def get_hyper_encoded(self, page: int = 1, page_size: int = 10,
+                          where: Mapping = None, order_by: str = None,
+                          if_none_match: Optional[str] = None,
+                          accept_gzip: bool = False) -> EncodedPage:
+        """
+        Get the ``get_hyper`` response as JSON bytes with a strong ETag.
+
+        The bytes are encoded on first use and then served from the
+        payload cache. The ETag is derived from the identity of the
+        dataset file and the request, so a matching ``if_none_match``
+        is answered without reading any row.
+
+        Args:
+            page (int): The page number, starting from 1.
+            page_size (int): The number of items per page.
+            where (Mapping, optional): Only keep the rows having these
+                values.
+            order_by (str, optional): Sort the rows on ``Count`` or
+                ``Rank``, descending when prefixed with ``-``.
+            if_none_match (str, optional): The ``If-None-Match`` header
+                sent by the client.
+            accept_gzip (bool): Whether to return the gzip-compressed
+                variant.
+
+        Returns:
+            EncodedPage: The ETag and the body, which is None when the
+                client's copy is current.
+        """
+        assert type(page) is int and page > 0
+        assert type(page_size) is int and page_size > 0
+        self.dataset()  # Catch up with a watched dataset first
+        query = QueryIndex.normalize(where, order_by)
+        etag = make_etag(self.__tag, self.__generation, self._loading(),
+                         page, page_size, query)
+        return self.__payloads.respond(
+            etag, lambda: self.get_hyper(page, page_size, where, order_by),
+            if_none_match, accept_gzip)
@@ -10,7 +10,13 @@ the dataset and the next index in the sequence.
 
 import csv
 import math
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from indexed_dataset import IndexedDataset
+from page_cursor import decode_cursor, encode_cursor
+from page_payload import EncodedPage, PayloadCache, dataset_tag, make_etag
+
+CHUNK = 1024
 
 
 def index_range(page: int, page_size: int) -> Tuple[int, int]:
@@ -37,14 +43,32 @@ class Server:
 
     DATA_FILE = "Popular_Baby_Names.csv"
 
-    def __init__(self):
+    def __init__(self, loader: Callable[[str], Sequence[List]] = None,
+                 payload_cache: PayloadCache = None):
         """Initializes the server object.
 
         The server object is initialized with a cache that is used to store the
         dataset. The cache is a dictionary where the key is the index of each
         item in the dataset and the value is the data for that item.
+
+        Args:
+            loader (Callable[[str], Sequence[List]], optional): A callable
+                that takes the path of the CSV file and returns a list-like
+                view of its rows without the header, such as
+                ``MappedDataset``, or ``WatchedDataset`` to follow changes
+                to the file. Defaults to reading the whole file into
+                memory.
+            payload_cache (PayloadCache, optional): Where to keep the JSON
+                bytes of ``get_hyper_index_encoded``. Defaults to a cache
+                of 256 responses.
         """
         self.__dataset = None
+        self.__loader = loader
+        self.__indexed_dataset = None
+        self.__generation = 0
+        self.__tag = None
+        self.__payloads = (PayloadCache() if payload_cache is None
+                           else payload_cache)
 
     def dataset(self) -> List[List]:
         """Returns the dataset as a list of lists.
@@ -58,14 +82,61 @@ class Server:
         Returns:
             List[List]: The dataset as a list of lists.
         """
+        if self.__dataset is None:
+            self.__tag = dataset_tag(self.DATA_FILE)
+        if self.__dataset is None and self.__loader is not None:
+            self.__dataset = self.__loader(self.DATA_FILE)
         if self.__dataset is None:
             with open(self.DATA_FILE) as f:
                 reader = csv.reader(f)
                 dataset = [row for row in reader]
             self.__dataset = dataset[1:]
 
+        if hasattr(self.__dataset, "snapshot"):
+            return self._follow(self.__dataset)
         return self.__dataset
 
+    def _follow(self, source) -> List[List]:
+        """Takes a snapshot of a hot-reloading dataset and catches up with it.
+
+        When rows were appended, they are added to the indexed dataset as
+        live rows and earlier deletions are kept. When the file was
+        reloaded from scratch, positions no longer match and the index is
+        rebuilt on the next use, forgetting the deletions.
+
+        Args:
+            source: A dataset with ``snapshot()`` and generations, such as
+                ``WatchedDataset``.
+
+        Returns:
+            List[List]: The rows of the snapshot.
+        """
+        rows = source.snapshot()
+        generation = source.generation
+        if generation != self.__generation:
+            if self.__indexed_dataset is not None:
+                if source.rewritten <= self.__generation:
+                    self.__indexed_dataset.extend(rows)
+                else:
+                    self.__indexed_dataset = None
+            self.__generation = generation
+            self.__tag = dataset_tag(self.DATA_FILE)
+        return rows
+
+    def indexed_dataset(self) -> IndexedDataset:
+        """Returns the dataset indexed by the original position of each row.
+
+        The index is built once on top of `dataset` and supports deleting
+        rows (``del indexed[i]``) without shifting the remaining keys.
+
+        Returns:
+            IndexedDataset: A mapping of live indexes to rows.
+        """
+        dataset = self.dataset()
+        if self.__indexed_dataset is None:
+            self.__indexed_dataset = IndexedDataset(dataset)
+        return self.__indexed_dataset
+
     def get_page(self, page: int = 1, page_size: int = 10) -> List[List]:
         """Returns a page of data as a list of lists.
 
@@ -82,10 +153,7 @@ class Server:
         assert type(page) == int and type(page_size) == int
         assert page > 0 and page_size > 0
         start, end = index_range(page, page_size)
-        data = self.dataset()
-        if start > len(data):
-            return []
-        return data[start:end]
+        return self.dataset()[start:end]
 
     def get_hyper_index(self, index: int = None, page_size: int = 10) -> Dict:
         """Returns a hyper-index as a dictionary.
@@ -93,9 +161,9 @@ class Server:
         The hyper-index is a data structure that contains the index of each item
         in the dataset and the next index in the sequence.
 
-        The hyper-index is retrieved from the indexed dataset, which is a
-        dictionary where the key is the index of each item in the dataset and the
-        value is the data for that item.
+        The hyper-index is retrieved from the indexed dataset, which maps the
+        index of each item in the dataset to the data for that item. Seeking to
+        `index` and finding `next_index` take O(log n) even after deletions.
 
         Args:
             index (int): The index of the first item on the page. Defaults to
@@ -106,19 +174,9 @@ class Server:
             Dict: The hyper-index as a dictionary.
         """
         data = self.indexed_dataset()
-        assert index is not None and index >= 0 and index <= max(data.keys())
-        page_data = []
-        data_count = 0
-        next_index = None
-        start = index if index else 0
-        for i, item in data.items():
-            if i >= start and data_count < page_size:
-                page_data.append(item)
-                data_count += 1
-                continue
-            if data_count == page_size:
-                next_index = i
-                break
+        last = data.max_index()
+        assert index is not None and last is not None and 0 <= index <= last
+        page_data, next_index = data.page(index, page_size)
         page_info = {
             'index': index,
             'next_index': next_index,
@@ -126,3 +184,83 @@ class Server:
             'data': page_data,
         }
         return page_info
+
+    def get_hyper_index_encoded(self, index: int = None, page_size: int = 10,
+                                if_none_match: Optional[str] = None,
+                                accept_gzip: bool = False) -> EncodedPage:
+        """Returns the hyper-index as JSON bytes with a strong ETag.
+
+        The bytes are encoded on first use and then served from the
+        payload cache. The ETag is derived from the identity of the
+        dataset file, the fingerprint of the live rows, which changes with
+        every deletion and is the same in every process with the same
+        deletions, and the request, so a matching ``if_none_match`` is
+        answered without reading any row.
+
+        Args:
+            index (int): The index of the first item on the page. Defaults to
+                None.
+            page_size (int): The page size. Defaults to 10.
+            if_none_match (str, optional): The ``If-None-Match`` header sent
+                by the client.
+            accept_gzip (bool): Whether to return the gzip-compressed
+                variant.
+
+        Returns:
+            EncodedPage: The ETag and the body, which is None when the
+                client's copy is current.
+        """
+        data = self.indexed_dataset()
+        etag = make_etag(self.__tag, self.__generation, data.fingerprint(),
+                         index, page_size)
+        return self.__payloads.respond(
+            etag, lambda: self.get_hyper_index(index, page_size),
+            if_none_match, accept_gzip)
+
+    def iter_rows(self, start_index: int = 0) -> Iterator[List]:
+        """Streams the live rows from ``start_index`` to the end.
+
+        Rows are read in chunks of ``CHUNK`` live rows, and each chunk seeks
+        from where the previous one stopped, so rows deleted ahead of the
+        stream are skipped.
+
+        Args:
+            start_index (int): The index of the first row to consider.
+                Defaults to 0.
+
+        Yields:
+            List: Each live row, in index order.
+        """
+        assert type(start_index) == int and start_index >= 0
+        data = self.indexed_dataset()
+        index = start_index
+        while index is not None:
+            rows, index = data.page(index, CHUNK)
+            yield from rows
+
+    def iter_pages(self, page_size: int = 10, cursor: Optional[str] = None
+                   ) -> Iterator[Tuple[List[List], Optional[str]]]:
+        """Streams the live rows page by page, without per-page metadata.
+
+        The cursor of a page holds the index of the first live row after
+        it, like ``next_index``, so resuming from it after deletions
+        neither skips nor repeats a row.
+
+        Args:
+            page_size (int): The page size. Defaults to 10.
+            cursor (str, optional): A cursor yielded by an earlier stream,
+                to resume after the page it came with. Defaults to the
+                first page.
+
+        Yields:
+            Tuple[List[List], Optional[str]]: Each page, and the cursor of
+                the page after it, or None after the last page.
+        """
+        assert type(page_size) == int and page_size > 0
+        data = self.indexed_dataset()
+        index = 0 if cursor is None else decode_cursor(cursor)
+        while index is not None:
+            rows, index = data.page(index, page_size)
+            if not rows:
+                return
+            yield rows, None if index is None else encode_cursor(index)
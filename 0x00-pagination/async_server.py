@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Asynchronous pagination server.
+
+This module provides an asyncio-native server that loads the dataset in a
+worker thread exactly once and then serves the simple, hypermedia and
+deletion-resilient pages from the event loop.
+"""
+import asyncio
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from page_payload import EncodedPage
+
+HyperServer = __import__('2-hypermedia_pagination').Server
+IndexServer = __import__('3-hypermedia_del_pagination').Server
+
+
+class AsyncServer:
+    """Serve pages of the baby names dataset without blocking the loop.
+
+    The first request, or ``warm_up`` at startup, starts loading the
+    dataset in a worker thread and every request awaits the same future,
+    so concurrent first requests never parse the file twice, and the
+    query index is built there too. Once loaded, pages are sliced
+    straight from memory on the event loop; only filtered or sorted
+    queries that have to scan posting lists are evaluated in the
+    executor first.
+    """
+
+    def __init__(self, loader: Callable[[str], Sequence[List]] = None,
+                 page_cache=None, executor: Executor = None):
+        """Initialize the server without loading anything yet.
+
+        Args:
+            loader (Callable[[str], Sequence[List]], optional): The dataset
+                loader passed on to the synchronous servers.
+            page_cache (optional): The ``get_hyper`` response cache passed
+                on to the hypermedia server.
+            executor (Executor, optional): Where to run the loading.
+                Defaults to the event loop's default executor.
+        """
+        self.__loader = loader
+        self.__page_cache = page_cache
+        self.__executor = executor
+        self.__ready = None
+
+    def _load(self) -> Tuple[HyperServer, IndexServer]:
+        """Load the dataset and build its indexes, in a worker thread.
+
+        The loader runs once and both servers get what it returned, so a
+        hot-reloading dataset such as ``WatchedDataset`` is followed by
+        each of them rather than frozen in its first snapshot.
+
+        Returns:
+            Tuple[HyperServer, IndexServer]: The synchronous servers, which
+                share the one loaded dataset.
+        """
+        sources = []
+
+        def load(path: str) -> Sequence[List]:
+            if not sources:
+                sources.append(self.__loader(path))
+            return sources[0]
+
+        if self.__loader is None:
+            hyper = HyperServer(page_cache=self.__page_cache)
+            dataset = hyper.dataset()
+            index = IndexServer(loader=lambda path: dataset)
+        else:
+            hyper = HyperServer(loader=load, page_cache=self.__page_cache)
+            index = IndexServer(loader=load)
+        hyper.query_index()
+        index.indexed_dataset()
+        return hyper, index
+
+    def _servers(self) -> "asyncio.Future[Tuple[HyperServer, IndexServer]]":
+        """Start loading on first use and return the shared future.
+
+        A failed load is retried by the next request.
+        """
+        ready = self.__ready
+        if ready is None or (ready.done() and ready.exception() is not None):
+            loop = asyncio.get_running_loop()
+            ready = loop.run_in_executor(self.__executor, self._load)
+            self.__ready = ready
+        return ready
+
+    async def warm_up(self) -> None:
+        """Load the dataset now instead of on the first request."""
+        await self._servers()
+
+    async def _evaluate(self, hyper: HyperServer, where: Mapping,
+                        order_by: str) -> None:
+        """Evaluate a filtered or sorted query in the executor if it scans.
+
+        The positions are kept by the query index, so the page is then
+        sliced on the event loop without stalling it.
+        """
+        if not where and order_by is None:
+            return
+        index = hyper.query_index()
+        if index.ready(where, order_by):
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.__executor, index.positions, where,
+                                   order_by)
+
+    async def get_page(self, page: int = 1, page_size: int = 10,
+                       where: Mapping = None, order_by: str = None) -> List[List]:
+        """Get a page of data from the dataset.
+
+        Args:
+            page (int): The page number, starting from 1.
+            page_size (int): The number of items per page.
+            where (Mapping, optional): Only keep the rows having these
+                values.
+            order_by (str, optional): Sort the rows on ``Count`` or
+                ``Rank``, descending when prefixed with ``-``.
+
+        Returns:
+            List[List]: The rows of the page.
+        """
+        hyper, _ = await self._servers()
+        await self._evaluate(hyper, where, order_by)
+        return hyper.get_page(page, page_size, where, order_by)
+
+    async def get_hyper(self, page: int = 1, page_size: int = 10,
+                        where: Mapping = None, order_by: str = None) -> Dict:
+        """Get a page with its hypermedia metadata.
+
+        Args:
+            page (int): The page number, starting from 1.
+            page_size (int): The number of items per page.
+            where (Mapping, optional): Only keep the rows having these
+                values.
+            order_by (str, optional): Sort the rows on ``Count`` or
+                ``Rank``, descending when prefixed with ``-``.
+
+        Returns:
+            Dict: The response of ``Server.get_hyper``.
+        """
+        hyper, _ = await self._servers()
+        await self._evaluate(hyper, where, order_by)
+        return hyper.get_hyper(page, page_size, where, order_by)
+
+    async def get_hyper_index(self, index: int = None,
+                              page_size: int = 10) -> Dict:
+        """Get a deletion-resilient page starting at ``index``.
+
+        Args:
+            index (int): The index of the first item on the page.
+            page_size (int): The page size.
+
+        Returns:
+            Dict: The response of ``Server.get_hyper_index``.
+        """
+        _, server = await self._servers()
+        return server.get_hyper_index(index, page_size)
+
+    async def get_hyper_encoded(self, page: int = 1, page_size: int = 10,
+                                where: Mapping = None, order_by: str = None,
+                                if_none_match: Optional[str] = None,
+                                accept_gzip: bool = False) -> EncodedPage:
+        """Get a hypermedia page as JSON bytes with a strong ETag.
+
+        Args:
+            page (int): The page number, starting from 1.
+            page_size (int): The number of items per page.
+            where (Mapping, optional): Only keep the rows having these
+                values.
+            order_by (str, optional): Sort the rows on ``Count`` or
+                ``Rank``, descending when prefixed with ``-``.
+            if_none_match (str, optional): The client's ``If-None-Match``.
+            accept_gzip (bool): Whether to return the gzip variant.
+
+        Returns:
+            EncodedPage: The response of ``Server.get_hyper_encoded``.
+        """
+        hyper, _ = await self._servers()
+        await self._evaluate(hyper, where, order_by)
+        return hyper.get_hyper_encoded(page, page_size, where, order_by,
+                                       if_none_match, accept_gzip)
+
+    async def get_hyper_index_encoded(self, index: int = None,
+                                      page_size: int = 10,
+                                      if_none_match: Optional[str] = None,
+                                      accept_gzip: bool = False
+                                      ) -> EncodedPage:
+        """Get a deletion-resilient page as JSON bytes with a strong ETag.
+
+        Args:
+            index (int): The index of the first item on the page.
+            page_size (int): The page size.
+            if_none_match (str, optional): The client's ``If-None-Match``.
+            accept_gzip (bool): Whether to return the gzip variant.
+
+        Returns:
+            EncodedPage: The response of
+                ``Server.get_hyper_index_encoded``.
+        """
+        _, server = await self._servers()
+        return server.get_hyper_index_encoded(index, page_size,
+                                              if_none_match, accept_gzip)
+
+    async def delete(self, index: int) -> None:
+        """Delete the row at ``index`` from the deletion-resilient pages.
+
+        Args:
+            index (int): The index of the row to delete.
+        """
+        _, server = await self._servers()
+        del server.indexed_dataset()[index]
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Columnar, typed in-memory dataset.
+
+This module provides a list-like view of a CSV file that stores each
+column as one typed array instead of one ``str`` per cell: integer
+columns are packed in the smallest unsigned ``array`` type that fits, and
+text columns are dictionary-encoded as integer codes into a table of
+their distinct values. Rows are only rebuilt as lists of strings when a
+page asks for them.
+"""
+import csv
+import sys
+from array import array
+from typing import Dict, List, Sequence, Union
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+TYPECODES = ("B", "H", "I", "Q")
+
+
+def _narrow(values: array) -> array:
+    """Return ``values`` in the smallest unsigned typecode that fits them.
+
+    Args:
+        values (array): Non-negative integers.
+
+    Returns:
+        array: The same integers, possibly with a smaller item size.
+    """
+    top = max(values, default=0)
+    for typecode in TYPECODES:
+        if top < 1 << (8 * array(typecode).itemsize):
+            if typecode != values.typecode:
+                return array(typecode, values)
+            return values
+    return values
+
+
+class ColumnarDataset(Sequence):
+    """A list-like view of CSV rows stored column by column.
+
+    A column is numeric when every value is written as a canonical
+    non-negative integer (so ``str(int(value)) == value`` and rebuilding
+    the rows gives back the exact original strings); any other column is
+    categorical.
+
+    Attributes:
+        names (List[str]): The column names, from the header.
+    """
+
+    def __init__(self, path: str):
+        """Parse the CSV file once, straight into typed columns.
+
+        Args:
+            path (str): The path to the CSV file. Its first line is the
+                header.
+        """
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            self.names = next(reader, [])
+            width = len(self.names)
+            numbers = [array("Q") for _ in range(width)]
+            codes: List[Union[array, None]] = [None] * width
+            tables: List[Dict[str, int]] = [{} for _ in range(width)]
+            self.__length = 0
+            for row in reader:
+                for i in range(width):
+                    value = row[i] if i < len(row) else ""
+                    if codes[i] is None:
+                        number = (int(value) if value.isascii()
+                                  and value.isdecimal() else -1)
+                        if 0 <= number < 1 << 64 and value == str(number):
+                            numbers[i].append(number)
+                            continue
+                        codes[i] = self._encode_existing(numbers[i],
+                                                         tables[i])
+                    table = tables[i]
+                    code = table.get(value)
+                    if code is None:
+                        code = table[value] = len(table)
+                    codes[i].append(code)
+                self.__length += 1
+        self.__columns = []
+        self.__categories = []
+        for i in range(width):
+            if codes[i] is None:
+                self.__columns.append(_narrow(numbers[i]))
+                self.__categories.append(None)
+            else:
+                self.__columns.append(_narrow(codes[i]))
+                self.__categories.append(list(tables[i]))
+
+    @staticmethod
+    def _encode_existing(numbers: array, table: Dict[str, int]) -> array:
+        """Turn a column believed numeric so far into a categorical one.
+
+        Args:
+            numbers (array): The integers parsed before the first value that
+                is not one.
+            table (Dict[str, int]): The empty value-to-code table to fill.
+
+        Returns:
+            array: The codes of the values parsed so far.
+        """
+        codes = array("Q")
+        for number in numbers:
+            value = str(number)
+            code = table.get(value)
+            if code is None:
+                code = table[value] = len(table)
+            codes.append(code)
+        del numbers[:]
+        return codes
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return self.__length
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[List, List[List]]:
+        """Rebuild a single row or a window of rows as lists of strings.
+
+        Args:
+            index (Union[int, slice]): A row number or a slice of rows.
+
+        Returns:
+            Union[List, List[List]]: The row, or the list of rows.
+        """
+        if isinstance(index, slice):
+            cells = []
+            for column, table in zip(self.__columns, self.__categories):
+                if table is None:
+                    cells.append(map(str, column[index]))
+                else:
+                    cells.append(map(table.__getitem__, column[index]))
+            return [list(row) for row in zip(*cells)]
+        if index < 0:
+            index += self.__length
+        if not 0 <= index < self.__length:
+            raise IndexError("dataset index out of range")
+        return [str(column[index]) if table is None else table[column[index]]
+                for column, table in zip(self.__columns, self.__categories)]
+
+    def _position(self, name: str) -> int:
+        """Return the position of the column called ``name``.
+
+        Raises:
+            KeyError: If there is no such column.
+        """
+        try:
+            return self.names.index(name)
+        except ValueError:
+            raise KeyError(name) from None
+
+    def is_numeric(self, name: str) -> bool:
+        """Tell whether the column ``name`` holds integers."""
+        return self.__categories[self._position(name)] is None
+
+    def column(self, name: str) -> array:
+        """Return the integers, or the category codes, of column ``name``."""
+        return self.__columns[self._position(name)]
+
+    def categories(self, name: str) -> List[str]:
+        """Return the distinct values of a categorical column, by code.
+
+        Raises:
+            KeyError: If the column does not exist or is numeric.
+        """
+        table = self.__categories[self._position(name)]
+        if table is None:
+            raise KeyError("{} is not categorical".format(name))
+        return table
+
+    def numpy(self, name: str):
+        """Return column ``name`` as a zero-copy NumPy array.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        if numpy is None:
+            raise ImportError("numpy is required for ColumnarDataset.numpy")
+        column = self.column(name)
+        return numpy.frombuffer(column, dtype=column.typecode)
+
+    def memory_usage(self) -> int:
+        """Return the bytes held by the columns and category tables.
+
+        This counts the array buffers plus the category strings, which is
+        what the dataset keeps resident beyond a few fixed-size objects.
+        """
+        total = 0
+        for column, table in zip(self.__columns, self.__categories):
+            total += sys.getsizeof(column)
+            if table is not None:
+                total += sys.getsizeof(table)
+                total += sum(sys.getsizeof(value) for value in table)
+        return total
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Secondary indexes for filtering and sorting the dataset.
+
+This module provides posting lists of row positions for the categorical
+columns and pre-sorted permutations for the numeric ones, so that a
+filtered or sorted page is sliced out of a precomputed list of positions
+instead of scanning the whole dataset on every request.
+"""
+import heapq
+from array import array
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+FIELDS = {
+    "Year": 0,
+    "Gender": 1,
+    "Ethnicity": 2,
+    "Count": 4,
+    "Rank": 5,
+}
+FILTERS = ("Year", "Gender", "Ethnicity")
+SORTS = ("Count", "Rank")
+CHUNK = 4096
+RESULTS = 256
+
+
+class QueryIndex:
+    """Posting lists and sort orders over the rows of a dataset.
+
+    ``where`` maps column names of ``FILTERS`` to the value a row must
+    have, and ``order_by`` is a column of ``SORTS``, prefixed with ``-``
+    for descending order. Equal values keep the dataset order. The
+    positions matching the ``capacity`` most recently used queries are
+    kept, so every later page of the same query is a slice; queries
+    matching nothing are not kept, since they are cheap to evaluate
+    again.
+
+    Attributes:
+        dataset (Sequence[List]): The rows being indexed.
+    """
+
+    def __init__(self, dataset: Sequence[List], capacity: int = RESULTS):
+        """Build the posting lists and the sort orders in one pass.
+
+        Args:
+            dataset (Sequence[List]): The rows, as returned by
+                ``Server.dataset()``.
+            capacity (int): The number of query results to keep.
+        """
+        self.dataset: Sequence[List] = ()
+        self.__postings: Dict[str, Dict[str, array]] = {
+            field: {} for field in FILTERS}
+        self.__keys = {field: array("q") for field in SORTS}
+        self.__orders: Dict[Tuple[str, bool], array] = {
+            (field, reverse): array("I")
+            for field in SORTS for reverse in (False, True)}
+        self.capacity = capacity
+        self.__lock = Lock()
+        self.__results: Dict[Tuple, Sequence[int]] = OrderedDict()
+        self.extend(dataset)
+
+    def extend(self, dataset: Sequence[List]) -> None:
+        """Index the rows appended to the dataset since the last call.
+
+        ``dataset`` must start with the rows already indexed. New posting
+        lists and sort orders are built beside the current ones and then
+        swapped in, so queries running meanwhile see one or the other.
+
+        Args:
+            dataset (Sequence[List]): The rows, old and new.
+        """
+        size = len(self.dataset)
+        postings = {field: dict(values)
+                    for field, values in self.__postings.items()}
+        appended = {field: {} for field in FILTERS}
+        keys = {field: array("q", values)
+                for field, values in self.__keys.items()}
+        for first in range(size, len(dataset), CHUNK):
+            rows = dataset[first:first + CHUNK]
+            for position, row in enumerate(rows, first):
+                for field in FILTERS:
+                    value = row[FIELDS[field]]
+                    posting = appended[field].get(value)
+                    if posting is None:
+                        posting = appended[field][value] = array("I")
+                    posting.append(position)
+                for field in SORTS:
+                    keys[field].append(int(row[FIELDS[field]]))
+        for field in FILTERS:
+            for value, posting in appended[field].items():
+                postings[field][value] = (
+                    postings[field].get(value, array("I")) + posting)
+        orders = {}
+        for (field, reverse), order in self.__orders.items():
+            key = keys[field].__getitem__
+            if reverse:
+                new = sorted(range(size, len(dataset)), key=key, reverse=True)
+                merged = heapq.merge(order, new, key=key, reverse=True)
+            else:
+                new = sorted(range(size, len(dataset)), key=key)
+                merged = heapq.merge(order, new, key=key)
+            orders[field, reverse] = array("I", merged)
+        self.dataset = dataset
+        self.__postings = postings
+        self.__keys = keys
+        self.__orders = orders
+        self.__results = OrderedDict()
+
+    @staticmethod
+    def normalize(where: Optional[Mapping] = None,
+                  order_by: Optional[str] = None) -> Tuple:
+        """Return a hashable key identifying a query.
+
+        Values are compared as strings, so ``{"Year": 2016}`` and
+        ``{"Year": "2016"}`` are the same query.
+
+        Args:
+            where (Mapping, optional): The required column values.
+            order_by (str, optional): The sort column.
+
+        Returns:
+            Tuple: The sorted ``where`` items followed by ``order_by``.
+
+        Raises:
+            ValueError: If a column cannot be filtered or sorted on.
+        """
+        items = tuple(sorted((field, str(value))
+                             for field, value in (where or {}).items()))
+        for field, _ in items:
+            if field not in FILTERS:
+                raise ValueError("cannot filter on {!r}".format(field))
+        if order_by is not None and order_by.lstrip("-") not in SORTS:
+            raise ValueError("cannot sort on {!r}".format(order_by))
+        return items, order_by
+
+    def positions(self, where: Optional[Mapping] = None,
+                  order_by: Optional[str] = None) -> Sequence[int]:
+        """Return the positions of the matching rows, in result order.
+
+        Args:
+            where (Mapping, optional): The required column values.
+            order_by (str, optional): The sort column, ``-`` for descending.
+
+        Returns:
+            Sequence[int]: The row positions.
+        """
+        key = self.normalize(where, order_by)
+        results = self.__results
+        with self.__lock:
+            result = results.get(key)
+            if result is not None:
+                results.move_to_end(key)
+                return result
+        result = self._evaluate(*key)
+        if result:
+            with self.__lock:
+                results[key] = result
+                if len(results) > self.capacity:
+                    results.popitem(last=False)
+        return result
+
+    def ready(self, where: Optional[Mapping] = None,
+              order_by: Optional[str] = None) -> bool:
+        """Tell whether ``positions`` can answer without a scan.
+
+        That is the case for a query whose result is kept, a single filter
+        without sorting, or a sort without filter.
+
+        Args:
+            where (Mapping, optional): The required column values.
+            order_by (str, optional): The sort column, ``-`` for descending.
+
+        Returns:
+            bool: False when evaluating the query walks posting lists.
+        """
+        key = self.normalize(where, order_by)
+        items, order_by = key
+        if key in self.__results:
+            return True
+        return not items or len(items) == 1 and order_by is None
+
+    def _evaluate(self, items: Tuple, order_by: Optional[str]) -> Sequence[int]:
+        """Compute the positions of a normalized query.
+
+        The shortest posting list is filtered by the others; a sort walks
+        the pre-sorted permutation and keeps the matching positions.
+        """
+        postings = [self.__postings[field].get(value, array("I"))
+                    for field, value in items]
+        postings.sort(key=len)
+        if not postings:
+            matched = None
+        elif len(postings) == 1:
+            matched = postings[0]
+        else:
+            others = [set(posting) for posting in postings[1:]]
+            matched = array("I", (position for position in postings[0]
+                                  if all(position in other
+                                         for other in others)))
+        if order_by is None:
+            return matched if matched is not None else range(len(self.dataset))
+        if matched is not None and not matched:
+            return matched
+        order = self.__orders[order_by.lstrip("-"), order_by[0] == "-"]
+        if matched is None:
+            return order
+        wanted = set(matched)
+        return array("I", (position for position in order
+                           if position in wanted))
+
+    def count(self, where: Optional[Mapping] = None,
+              order_by: Optional[str] = None) -> int:
+        """Return the number of rows matching ``where``."""
+        return len(self.positions(where, order_by))
+
+    def rows(self, where: Optional[Mapping] = None,
+             order_by: Optional[str] = None,
+             start: int = 0, end: Optional[int] = None) -> List[List]:
+        """Return the matching rows in ``[start, end)`` of the result.
+
+        Args:
+            where (Mapping, optional): The required column values.
+            order_by (str, optional): The sort column, ``-`` for descending.
+            start (int): The first result position.
+            end (int, optional): The result position to stop at.
+
+        Returns:
+            List[List]: The rows.
+        """
+        positions = self.positions(where, order_by)[start:end]
+        dataset = self.dataset
+        return [dataset[position] for position in positions]
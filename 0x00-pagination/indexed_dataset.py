@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Deletion-resilient index over a dataset.
+
+This module provides a mapping from the original position of each row to
+the row itself that keeps working while rows are deleted. Live rows are
+tracked with a Fenwick (binary indexed) tree, so seeking to the first
+live row at or after any index costs O(log n) instead of a scan.
+"""
+import hashlib
+from array import array
+from typing import Iterator, List, Mapping, Optional, Sequence, Tuple
+
+
+def _index_hash(index: int) -> int:
+    """Return a stable 64-bit hash of a row index."""
+    digest = hashlib.blake2b(index.to_bytes(8, "little"), digest_size=8)
+    return int.from_bytes(digest.digest(), "little")
+
+
+class IndexedDataset(Mapping):
+    """A read-only mapping of ``index -> row`` that supports live deletes.
+
+    Keys are the positions the rows had when the dataset was loaded, and
+    they never shift: deleting a row only removes its key.
+
+    Attributes:
+        dataset (Sequence[List]): The rows being indexed.
+        version (int): Incremented whenever a row is deleted or appended,
+            so that pages built earlier can be recognised as stale.
+    """
+
+    def __init__(self, dataset: Sequence[List]):
+        """Index every row of ``dataset`` as live.
+
+        Args:
+            dataset (Sequence[List]): The rows, as returned by
+                ``Server.dataset()``.
+        """
+        self.dataset = dataset
+        self.version = 0
+        self.__deleted = 0
+        size = len(dataset)
+        self.__size = size
+        self.__live = size
+        self.__alive = bytearray(b"\x01") * size
+        self.__tree = array("l", (i & -i for i in range(size + 1)))
+        self.__top = 1 << size.bit_length() >> 1 if size else 0
+
+    def extend(self, dataset: Sequence[List]) -> None:
+        """Index the rows appended to the dataset as live, in O(k log n).
+
+        Deleted rows stay deleted, and only the tree nodes of the new
+        positions are computed.
+
+        Args:
+            dataset (Sequence[List]): The rows, starting with the ones
+                already indexed.
+        """
+        old = self.__size
+        size = len(dataset)
+        tree = self.__tree
+        for i in range(old + 1, size + 1):
+            total = 1
+            low = i - (i & -i)
+            j = i - 1
+            while j > low:
+                total += tree[j]
+                j &= j - 1
+            tree.append(total)
+        self.__alive.extend(b"\x01" * (size - old))
+        self.__live += size - old
+        self.__top = 1 << size.bit_length() >> 1 if size else 0
+        self.dataset = dataset
+        self.__size = size
+        self.version += 1
+
+    def _rank(self, index: int) -> int:
+        """Return how many live rows come before ``index``.
+
+        Args:
+            index (int): A position in ``[0, size]``.
+
+        Returns:
+            int: The number of live rows in ``[0, index)``.
+        """
+        tree = self.__tree
+        total = 0
+        while index > 0:
+            total += tree[index]
+            index &= index - 1
+        return total
+
+    def _select(self, rank: int) -> int:
+        """Return the position of the live row with the given rank.
+
+        Args:
+            rank (int): The zero-based rank among live rows.
+
+        Returns:
+            int: The position of that row, or ``size`` if there is none.
+        """
+        tree = self.__tree
+        size = self.__size
+        pos = 0
+        step = self.__top
+        while step:
+            nxt = pos + step
+            if nxt <= size and tree[nxt] <= rank:
+                pos = nxt
+                rank -= tree[nxt]
+            step >>= 1
+        return pos
+
+    def next_live(self, index: int) -> Optional[int]:
+        """Return the first live index at or after ``index``.
+
+        Args:
+            index (int): The index to start from.
+
+        Returns:
+            Optional[int]: The live index, or None past the last live row.
+        """
+        if index < 0:
+            index = 0
+        if index < self.__size and self.__alive[index]:
+            return index
+        if index >= self.__size:
+            return None
+        pos = self._select(self._rank(index))
+        return pos if pos < self.__size else None
+
+    def page(self, index: int,
+             page_size: int) -> Tuple[List[List], Optional[int]]:
+        """Collect up to ``page_size`` live rows starting at ``index``.
+
+        Args:
+            index (int): The first index to consider.
+            page_size (int): The maximum number of rows to return.
+
+        Returns:
+            Tuple[List[List], Optional[int]]: The rows, and the index of the
+                next live row after them, or None if there is none.
+        """
+        positions = []
+        pos = self.next_live(index)
+        while pos is not None and len(positions) < page_size:
+            positions.append(pos)
+            pos = self.next_live(pos + 1)
+        rows = []
+        run_start = 0
+        for i in range(1, len(positions) + 1):
+            if i == len(positions) or positions[i] != positions[i - 1] + 1:
+                first = positions[run_start]
+                rows.extend(self.dataset[first:positions[i - 1] + 1])
+                run_start = i
+        return rows, pos
+
+    def delete(self, index: int) -> None:
+        """Delete the row at ``index`` in O(log n).
+
+        Args:
+            index (int): The index of the row to delete.
+
+        Raises:
+            KeyError: If there is no live row at ``index``.
+        """
+        if not (0 <= index < self.__size and self.__alive[index]):
+            raise KeyError(index)
+        self.__alive[index] = 0
+        self.__live -= 1
+        self.version += 1
+        self.__deleted = (self.__deleted + _index_hash(index)) & (2**64 - 1)
+        tree = self.__tree
+        i = index + 1
+        while i <= self.__size:
+            tree[i] -= 1
+            i += i & -i
+
+    def __delitem__(self, index: int) -> None:
+        """Delete the row at ``index``, as with a dictionary."""
+        self.delete(index)
+
+    def __getitem__(self, index: int) -> List:
+        """Return the live row at ``index``.
+
+        Raises:
+            KeyError: If there is no live row at ``index``.
+        """
+        if not (isinstance(index, int) and 0 <= index < self.__size
+                and self.__alive[index]):
+            raise KeyError(index)
+        return self.dataset[index]
+
+    def __contains__(self, index: object) -> bool:
+        """Return whether ``index`` is a live key."""
+        return (isinstance(index, int) and 0 <= index < self.__size
+                and bool(self.__alive[index]))
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the live indexes in ascending order."""
+        pos = self.next_live(0)
+        while pos is not None:
+            yield pos
+            pos = self.next_live(pos + 1)
+
+    def __len__(self) -> int:
+        """Return the number of live rows."""
+        return self.__live
+
+    def fingerprint(self) -> Tuple[int, int, int]:
+        """Identify the set of live rows, the same way in every process.
+
+        Unlike ``version``, which counts changes, this only depends on
+        which rows are indexed and which were deleted: the number of rows,
+        the number of live rows and the sum of a stable hash of each
+        deleted index.
+
+        Returns:
+            Tuple[int, int, int]: The fingerprint.
+        """
+        return self.__size, self.__live, self.__deleted
+
+    def max_index(self) -> Optional[int]:
+        """Return the largest live index, or None if every row is deleted."""
+        if not self.__live:
+            return None
+        return self._select(self.__live - 1)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Memory-mapped CSV dataset.
+
+This module provides a read-only, list-like view over a CSV file that
+memory-maps the file and keeps a compact row-offset index beside it, so
+only the rows that are actually requested get decoded.
+"""
+import csv
+import io
+import mmap
+import os
+import struct
+from array import array
+from typing import List, Sequence, Union
+
+
+class MappedDataset(Sequence):
+    """A list-like view of the rows of a CSV file backed by ``mmap``.
+
+    The first time a file is opened, the byte offset of every row is
+    recorded in an index file stored next to it (``<path>.idx``). Later
+    opens map that index directly, so the cold start is just mapping two
+    files. Slicing decodes only the rows inside the requested window.
+
+    Each row must fit on a single line: quoted fields containing line
+    breaks are not supported by the offset index.
+
+    Attributes:
+        INDEX_SUFFIX (str): The suffix appended to the CSV path to name the
+            persisted index.
+        MAGIC (bytes): The signature written at the start of an index file.
+    """
+    INDEX_SUFFIX = ".idx"
+    MAGIC = b"PGIDX001"
+    HEADER = struct.Struct("<8sQQQ")
+
+    def __init__(self, path: str, skip_header: bool = True):
+        """Map the CSV file and load, or build, its row-offset index.
+
+        Args:
+            path (str): The path to the CSV file.
+            skip_header (bool, optional): Whether the first line is a header
+                that should not be exposed as a row. Defaults to True.
+        """
+        self.path = path
+        self.__skip = 1 if skip_header else 0
+        self.__file = open(path, "rb")
+        stat = os.fstat(self.__file.fileno())
+        self.__stamp = (stat.st_size, stat.st_mtime_ns)
+        self.__data = b""
+        if stat.st_size:
+            self.__data = mmap.mmap(self.__file.fileno(), 0,
+                                    access=mmap.ACCESS_READ)
+        self.__index_map = None
+        self.__offsets = self._load_index()
+
+    def _load_index(self) -> Sequence[int]:
+        """Return the row offsets, reusing the persisted index if it is fresh.
+
+        Returns:
+            Sequence[int]: The start offset of every line, followed by the
+                offset one past the end of the last line.
+        """
+        index_path = self.path + self.INDEX_SUFFIX
+        try:
+            with open(index_path, "rb") as f:
+                index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            index_map = None
+        if index_map is not None:
+            if len(index_map) >= self.HEADER.size:
+                magic, size, mtime, count = self.HEADER.unpack_from(index_map)
+                expected = self.HEADER.size + (count + 1) * 8
+                if (magic == self.MAGIC and (size, mtime) == self.__stamp
+                        and len(index_map) == expected):
+                    self.__index_map = index_map
+                    return memoryview(index_map)[self.HEADER.size:].cast("Q")
+            index_map.close()
+
+        offsets = self._build_index()
+        self._save_index(index_path, offsets)
+        return offsets
+
+    def _build_index(self) -> array:
+        """Scan the mapped file once and record where every line starts.
+
+        Returns:
+            array: The line offsets as unsigned 64-bit integers.
+        """
+        data = self.__data
+        size = len(data)
+        offsets = array("Q")
+        start = 0
+        while start < size:
+            offsets.append(start)
+            end = data.find(b"\n", start)
+            start = size if end == -1 else end + 1
+        offsets.append(size)
+        return offsets
+
+    def _save_index(self, index_path: str, offsets: array) -> None:
+        """Persist the offsets beside the CSV file, ignoring read-only dirs.
+
+        Args:
+            index_path (str): Where to write the index.
+            offsets (array): The offsets returned by ``_build_index``.
+        """
+        header = self.HEADER.pack(self.MAGIC, self.__stamp[0],
+                                  self.__stamp[1], len(offsets) - 1)
+        tmp_path = "{}.{}.tmp".format(index_path, os.getpid())
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(header)
+                offsets.tofile(f)
+            os.replace(tmp_path, index_path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def __len__(self) -> int:
+        """Return the number of rows, excluding the header if skipped."""
+        return max(len(self.__offsets) - 1 - self.__skip, 0)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[List, List[List]]:
+        """Decode a single row or a contiguous window of rows.
+
+        Args:
+            index (Union[int, slice]): A row number or a slice of rows.
+
+        Returns:
+            Union[List, List[List]]: The row, or the list of rows.
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            if start >= stop:
+                return []
+            return self._decode(start, stop)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("dataset index out of range")
+        return self._decode(index, index + 1)[0]
+
+    def _decode(self, start: int, stop: int) -> List[List]:
+        """Parse the rows in ``[start, stop)`` straight from the mapping.
+
+        Args:
+            start (int): The first row to decode.
+            stop (int): One past the last row to decode.
+
+        Returns:
+            List[List]: The decoded rows.
+        """
+        first = self.__offsets[start + self.__skip]
+        last = self.__offsets[stop + self.__skip]
+        text = self.__data[first:last].decode("utf-8")
+        return list(csv.reader(io.StringIO(text, newline="")))
+
+    def close(self) -> None:
+        """Release the file mappings."""
+        if isinstance(self.__offsets, memoryview):
+            self.__offsets.release()
+        self.__offsets = array("Q", [0])
+        if self.__index_map is not None:
+            self.__index_map.close()
+            self.__index_map = None
+        if isinstance(self.__data, mmap.mmap):
+            self.__data.close()
+        self.__data = b""
+        self.__file.close()
+
+    def __enter__(self) -> "MappedDataset":
+        """Return the dataset itself for use in a ``with`` block."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the dataset when leaving a ``with`` block."""
+        self.close()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Opaque keyset cursors for resuming a page stream.
+
+A cursor names the original position of the next row to read, so it
+keeps pointing at the right place when rows before or at it are deleted:
+reading resumes at the first live row from that position on.
+"""
+import base64
+import binascii
+import struct
+
+CURSOR = struct.Struct("<BQ")
+VERSION = 1
+
+
+def encode_cursor(index: int) -> str:
+    """Return the cursor resuming at ``index``.
+
+    Args:
+        index (int): The original position of the next row to read.
+
+    Returns:
+        str: A URL-safe token.
+    """
+    token = base64.urlsafe_b64encode(CURSOR.pack(VERSION, index))
+    return token.rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Return the position a cursor resumes at.
+
+    Args:
+        cursor (str): A token returned by ``encode_cursor``.
+
+    Returns:
+        int: The original position of the next row to read.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        version, index = CURSOR.unpack(raw)
+    except (binascii.Error, struct.error, TypeError):
+        raise ValueError("invalid cursor {!r}".format(cursor)) from None
+    if version != VERSION:
+        raise ValueError("invalid cursor {!r}".format(cursor))
+    return index
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Pre-encoded JSON page responses with strong ETags.
+
+The pagination servers encode a response to JSON bytes once, keep it in
+a bounded ``PayloadCache`` under its ETag and hand the same bytes to
+every later request. The ETag only depends on the identity of the
+dataset file and the request, so a client sending it back in
+``If-None-Match`` is answered "not modified" without reading any row,
+and several server processes reading the same file agree on it.
+"""
+import gzip
+import hashlib
+import json
+import os
+import secrets
+from collections import OrderedDict
+from typing import Hashable, List, NamedTuple, Optional
+
+GZIP_SUFFIX = "-gz"
+
+
+class EncodedPage(NamedTuple):
+    """A response ready to be written to the wire.
+
+    Attributes:
+        etag (str): The quoted strong ETag of this representation.
+        body (Optional[bytes]): The JSON bytes, gzip-compressed when
+            ``content_encoding`` is ``"gzip"``, or None when the client's
+            copy is still current.
+        content_encoding (Optional[str]): ``"gzip"`` or None.
+    """
+    etag: str
+    body: Optional[bytes]
+    content_encoding: Optional[str]
+
+    @property
+    def not_modified(self) -> bool:
+        """Whether to answer 304 Not Modified instead of sending a body."""
+        return self.body is None
+
+
+def dataset_tag(path: str) -> str:
+    """Identify the current content of a dataset file.
+
+    The tag is built from the size, modification time and inode of the
+    file, so it changes whenever the file is replaced or rewritten. When
+    the file cannot be read, as with a loader that does not use it, a
+    random tag is returned, which only stays valid for this load.
+
+    Args:
+        path (str): The path of the dataset file.
+
+    Returns:
+        str: A short opaque tag.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return secrets.token_hex(8)
+    return "{:x}-{:x}-{:x}".format(stat.st_size, stat.st_mtime_ns,
+                                   stat.st_ino)
+
+
+def make_etag(*parts: Hashable) -> str:
+    """Derive a quoted strong ETag from the version and the request.
+
+    Args:
+        *parts: The dataset tag and version, then the request parameters,
+            all with a stable ``repr``.
+
+    Returns:
+        str: The ETag, quoted as in an HTTP header.
+    """
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=12)
+    return '"{}"'.format(digest.hexdigest())
+
+
+def gzip_etag(etag: str) -> str:
+    """Return the ETag of the gzip variant of ``etag``.
+
+    Strong ETags must differ between byte representations, so the
+    compressed variant gets its own.
+    """
+    return etag[:-1] + GZIP_SUFFIX + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Tell whether an ``If-None-Match`` value covers ``etag``.
+
+    The comparison is the weak one the header calls for: ``W/`` prefixes
+    are ignored, and the identity and gzip variants of the same response
+    match each other since they carry the same JSON.
+
+    Args:
+        if_none_match (Optional[str]): The header value, a list of ETags
+            separated by commas, or ``*``.
+        etag (str): The ETag of the identity variant.
+
+    Returns:
+        bool: True if the client's copy is current.
+    """
+    if not if_none_match:
+        return False
+    compressed = gzip_etag(etag)
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag or candidate == compressed:
+            return True
+    return False
+
+
+def encode(payload) -> bytes:
+    """Encode a response as compact UTF-8 JSON.
+
+    Args:
+        payload (Mapping): The response of ``get_hyper`` or
+            ``get_hyper_index``.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    return json.dumps(dict(payload), ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class PayloadCache:
+    """A least recently used cache of encoded responses, keyed by ETag.
+
+    The gzip variant of a response is only compressed the first time it
+    is asked for, and is then kept next to the plain JSON. Compression
+    uses a fixed timestamp so that the bytes, and therefore the ETag,
+    are the same in every process.
+    """
+
+    def __init__(self, capacity: int = 256, compresslevel: int = 6):
+        """Initialize an empty cache.
+
+        Args:
+            capacity (int): The number of responses to keep.
+            compresslevel (int): The gzip compression level.
+        """
+        self.capacity = capacity
+        self.compresslevel = compresslevel
+        self.__entries = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of cached responses."""
+        return len(self.__entries)
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        self.__entries.clear()
+
+    def respond(self, etag: str, build, if_none_match: Optional[str] = None,
+                accept_gzip: bool = False) -> EncodedPage:
+        """Answer a request from the cache, encoding the response if needed.
+
+        Args:
+            etag (str): The ETag of the identity variant of the response.
+            build (Callable[[], Mapping]): Builds the response; it is only
+                called on a cache miss.
+            if_none_match (Optional[str]): The client's ``If-None-Match``.
+            accept_gzip (bool): Whether the client takes the gzip variant.
+
+        Returns:
+            EncodedPage: The body to send, or a "not modified" answer.
+        """
+        if accept_gzip:
+            encoding, tag = "gzip", gzip_etag(etag)
+        else:
+            encoding, tag = None, etag
+        if etag_matches(if_none_match, etag):
+            return EncodedPage(tag, None, encoding)
+        entries = self.__entries
+        entry: List[Optional[bytes]] = entries.get(etag)
+        if entry is None:
+            entry = [encode(build()), None]
+            entries[etag] = entry
+            if len(entries) > self.capacity:
+                entries.popitem(last=False)
+        else:
+            entries.move_to_end(etag)
+        if not accept_gzip:
+            return EncodedPage(tag, entry[0], None)
+        if entry[1] is None:
+            entry[1] = gzip.compress(entry[0], self.compresslevel, mtime=0)
+        return EncodedPage(tag, entry[1], encoding)
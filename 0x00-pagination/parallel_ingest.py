@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""Parallel CSV ingestion.
+
+This module parses large CSV files in a pool of worker processes. The
+file is cut into byte ranges that end on a line break, each worker
+parses one range at a time, and the rows come back in file order. The
+header line is skipped by starting the first range after it, so the rows
+are never copied just to drop it.
+
+``ingest`` returns every row as one list, and ``StreamingDataset`` serves
+the rows parsed so far while the rest of the file is still being parsed.
+Both can be passed to the servers as their ``loader``.
+"""
+import bisect
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from threading import Condition, Thread
+from typing import (Callable, Iterator, List, Optional, Sequence, Tuple,
+                    Union)
+
+CHUNK_SIZE = 1 << 23
+
+Progress = Callable[[int, int, int], None]
+
+
+def split_ranges(path: str, chunk_size: int = CHUNK_SIZE,
+                 skip_header: bool = True) -> List[Tuple[int, int]]:
+    """Cut a file into byte ranges of about ``chunk_size`` whole lines.
+
+    Each boundary is moved forward to just after the next line break, so
+    no line is split between two ranges. Rows must fit on a single line,
+    as with ``MappedDataset``.
+
+    Args:
+        path (str): The path to the CSV file.
+        chunk_size (int): The target size of a range, in bytes.
+        skip_header (bool): Whether to start after the first line.
+
+    Returns:
+        List[Tuple[int, int]]: The ``[start, end)`` ranges, in file order.
+    """
+    ranges = []
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        start = len(f.readline()) if skip_header else 0
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            end = min(f.tell() + len(f.readline()), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_range(path: str, start: int, end: int) -> List[List]:
+    """Parse the lines in a byte range of a CSV file.
+
+    Args:
+        path (str): The path to the CSV file.
+        start (int): The offset of the first line.
+        end (int): The offset just after the last line.
+
+    Returns:
+        List[List]: The rows, in order.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return list(csv.reader(io.StringIO(data.decode("utf-8"), newline="")))
+
+
+def iter_chunks(path: str, workers: Optional[int] = None,
+                chunk_size: int = CHUNK_SIZE, skip_header: bool = True,
+                progress: Optional[Progress] = None) -> Iterator[List[List]]:
+    """Parse a CSV file in parallel and yield its rows chunk by chunk.
+
+    The file is split, and every range submitted to a new pool, right
+    away on the calling thread, so the worker processes are started from
+    it even when the chunks are consumed by another thread. The chunks
+    are yielded in file order as soon as they and the ones before them
+    are parsed, and the pool is shut down once they were all yielded or
+    the iterator is closed. A file with a single range, or a single
+    worker, is parsed in this process, since a pool would cost more than
+    it saves.
+
+    Args:
+        path (str): The path to the CSV file.
+        workers (int, optional): The number of worker processes. Defaults
+            to the number of CPUs.
+        chunk_size (int): The target size of a range, in bytes.
+        skip_header (bool): Whether the first line is a header that
+            should not be returned as a row.
+        progress (Callable[[int, int, int], None], optional): Called after
+            each chunk with the bytes parsed so far, the bytes to parse in
+            total, and the rows parsed so far.
+
+    Returns:
+        Iterator[List[List]]: The rows of each range, in file order.
+    """
+    ranges = split_ranges(path, chunk_size, skip_header)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if len(ranges) < 2 or workers < 2:
+        results = (parse_range(path, start, end) for start, end in ranges)
+        return _yield_chunks(ranges, results, progress, None)
+    pool = ProcessPoolExecutor(workers)
+    futures = [pool.submit(parse_range, path, start, end)
+               for start, end in ranges]
+    results = (future.result() for future in futures)
+    return _yield_chunks(ranges, results, progress, pool)
+
+
+def _yield_chunks(ranges: List[Tuple[int, int]],
+                  results: Iterator[List[List]], progress: Optional[Progress],
+                  pool: Optional[ProcessPoolExecutor]
+                  ) -> Iterator[List[List]]:
+    """Yield the parsed chunks, report progress and shut the pool down."""
+    total = sum(end - start for start, end in ranges)
+    done = 0
+    rows = 0
+    try:
+        for (start, end), chunk in zip(ranges, results):
+            done += end - start
+            rows += len(chunk)
+            if progress is not None:
+                progress(done, total, rows)
+            yield chunk
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def ingest(path: str, workers: Optional[int] = None,
+           chunk_size: int = CHUNK_SIZE, skip_header: bool = True,
+           progress: Optional[Progress] = None) -> List[List]:
+    """Parse a whole CSV file in parallel.
+
+    Args:
+        path (str): The path to the CSV file.
+        workers (int, optional): The number of worker processes. Defaults
+            to the number of CPUs.
+        chunk_size (int): The target size of a range, in bytes.
+        skip_header (bool): Whether the first line is a header that
+            should not be returned as a row.
+        progress (Callable[[int, int, int], None], optional): See
+            ``iter_chunks``.
+
+    Returns:
+        List[List]: Every row, in file order.
+    """
+    rows = []
+    for chunk in iter_chunks(path, workers, chunk_size, skip_header,
+                             progress):
+        rows += chunk
+    return rows
+
+
+class StreamingDataset(Sequence):
+    """A list-like view of a CSV file that is usable while it loads.
+
+    The file is split and handed to the pool of ``iter_chunks`` by the
+    constructor, and a background thread publishes the chunks as they
+    are parsed. Reading a row or a slice only waits until the chunk
+    holding its last row is parsed, so the first pages can be served
+    right away; ``len`` and negative indexes need the total and wait for
+    the whole file, so callers that may run early should check ``done``
+    or slice instead.
+
+    Parsed chunks are kept as they arrive and never concatenated: rows
+    are found by bisecting the chunk boundaries.
+
+    Attributes:
+        path (str): The path to the CSV file.
+    """
+
+    def __init__(self, path: str, workers: Optional[int] = None,
+                 chunk_size: int = CHUNK_SIZE, skip_header: bool = True,
+                 progress: Optional[Progress] = None):
+        """Start parsing the file in the background.
+
+        Raises:
+            OSError: If the file cannot be read.
+
+        Args:
+            path (str): The path to the CSV file.
+            workers (int, optional): The number of worker processes.
+                Defaults to the number of CPUs.
+            chunk_size (int): The target size of a range, in bytes.
+            skip_header (bool): Whether the first line is a header that
+                should not be exposed as a row.
+            progress (Callable[[int, int, int], None], optional): See
+                ``iter_chunks``; it is called from the background thread.
+        """
+        self.path = path
+        self.__chunks: List[List[List]] = []
+        self.__ends: List[int] = []
+        self.__loaded = 0
+        self.__done = False
+        self.__error: Optional[BaseException] = None
+        self.__condition = Condition()
+        chunks = iter_chunks(path, workers, chunk_size, skip_header,
+                             progress)
+        self.__thread = Thread(
+            target=self._run, args=(chunks,),
+            name="ingest-{}".format(os.path.basename(path)), daemon=True)
+        self.__thread.start()
+
+    def _run(self, chunks: Iterator[List[List]]) -> None:
+        """Publish the chunks as they are parsed, then wake every waiter."""
+        try:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                with self.__condition:
+                    self.__chunks.append(chunk)
+                    self.__loaded += len(chunk)
+                    self.__ends.append(self.__loaded)
+                    self.__condition.notify_all()
+        except BaseException as error:
+            self.__error = error
+        finally:
+            with self.__condition:
+                self.__done = True
+                self.__condition.notify_all()
+
+    @property
+    def loaded(self) -> int:
+        """The number of rows parsed so far."""
+        return self.__loaded
+
+    @property
+    def done(self) -> bool:
+        """Whether the whole file was parsed."""
+        return self.__done
+
+    def wait(self, rows: Optional[int] = None) -> int:
+        """Block until ``rows`` rows are parsed, or the whole file if None.
+
+        Args:
+            rows (int, optional): The number of rows needed.
+
+        Returns:
+            int: The number of rows parsed, which is less than ``rows``
+                only when the file has fewer rows.
+
+        Raises:
+            Exception: Whatever made the parsing fail.
+        """
+        with self.__condition:
+            while not self.__done and (rows is None or self.__loaded < rows):
+                self.__condition.wait()
+        if self.__error is not None and (rows is None
+                                         or self.__loaded < rows):
+            raise self.__error
+        return self.__loaded
+
+    def __len__(self) -> int:
+        """Return the number of rows, once the whole file is parsed."""
+        return self.wait()
+
+    def _rows(self, start: int, stop: int) -> List[List]:
+        """Return the parsed rows in ``[start, stop)``."""
+        ends = self.__ends
+        chunks = self.__chunks
+        position = bisect.bisect_right(ends, start)
+        rows = []
+        while start < stop:
+            first = ends[position] - len(chunks[position])
+            rows += chunks[position][start - first:stop - first]
+            start = ends[position]
+            position += 1
+        return rows
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[List, List[List]]:
+        """Return a row or a slice of rows, waiting for them to be parsed.
+
+        Args:
+            index (Union[int, slice]): A row number or a slice of rows.
+
+        Returns:
+            Union[List, List[List]]: The row, or the list of rows.
+        """
+        if isinstance(index, slice):
+            if (index.step not in (None, 1) or index.start is not None
+                    and index.start < 0 or index.stop is None
+                    or index.stop < 0):
+                start, stop, step = index.indices(len(self))
+            else:
+                start = index.start or 0
+                stop = min(index.stop, self.wait(index.stop))
+                step = 1
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self._rows(start, stop) if start < stop else []
+        if index < 0:
+            index += len(self)
+        if index < 0 or self.wait(index + 1) <= index:
+            raise IndexError("dataset index out of range")
+        return self._rows(index, index + 1)[0]
+
+    def __iter__(self) -> Iterator[List]:
+        """Iterate over the rows, waiting for each chunk in turn."""
+        taken = 0
+        rows = 0
+        while True:
+            self.wait(rows + 1)
+            chunks = self.__chunks[taken:]
+            if not chunks:
+                return
+            taken += len(chunks)
+            for chunk in chunks:
+                rows += len(chunk)
+                yield from chunk
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Dataset shared by worker processes through shared memory.
+
+This module lets one process parse the CSV file once and publish it in a
+``multiprocessing.shared_memory`` segment, packed as in a binary
+snapshot, while every worker attaches to that segment read-only and
+decodes its pages straight from it. The rows exist once in memory
+however many workers serve them, and no Python object is shared, so
+reference counting never dirties the pages.
+
+Publish before forking the workers::
+
+    segment = publish("Popular_Baby_Names.csv")
+    # in each worker
+    server = Server(loader=SharedDataset)
+    # at shutdown, in the publisher
+    segment.close()
+    segment.unlink()
+"""
+import hashlib
+import inspect
+import os
+from multiprocessing import shared_memory
+from typing import Optional
+
+from snapshot_dataset import MAGIC, PackedRows, encode
+
+# Before Python 3.13, attaching registers the segment with the resource
+# tracker, which unlinks it when the tracker exits. Workers forked or
+# spawned by the publisher share its tracker, so the segment lives as long
+# as the publisher; unrelated processes must not attach on those versions.
+TRACK_PARAMETER = "track" in inspect.signature(
+    shared_memory.SharedMemory).parameters
+
+
+def segment_name(path: str) -> str:
+    """Return the default segment name for the CSV file at ``path``.
+
+    Args:
+        path (str): The CSV file.
+
+    Returns:
+        str: A name derived from the real path of the file.
+    """
+    digest = hashlib.sha1(os.path.realpath(path).encode("utf-8"))
+    return "pgds_" + digest.hexdigest()[:20]
+
+
+def publish(path: str, name: Optional[str] = None
+            ) -> shared_memory.SharedMemory:
+    """Parse the CSV file once and copy its rows into a new segment.
+
+    The magic number is written last, so a worker attaching too early
+    gets a ``ValueError`` rather than a partial dataset.
+
+    Args:
+        path (str): The CSV file.
+        name (str, optional): The segment name. Defaults to
+            ``segment_name(path)``.
+
+    Returns:
+        shared_memory.SharedMemory: The segment, which the caller closes and
+            unlinks once the workers are done.
+
+    Raises:
+        FileExistsError: If the segment is already published.
+    """
+    data = encode(path)
+    segment = shared_memory.SharedMemory(name or segment_name(path),
+                                         create=True, size=len(data))
+    segment.buf[len(MAGIC):len(data)] = data[len(MAGIC):]
+    segment.buf[:len(MAGIC)] = MAGIC
+    return segment
+
+
+class SharedDataset(PackedRows):
+    """A read-only, zero-copy view of a dataset published in shared memory.
+
+    Attributes:
+        path (str): The CSV file the dataset was published for.
+    """
+
+    def __init__(self, path: str, name: Optional[str] = None):
+        """Attach to the segment published for ``path``.
+
+        Args:
+            path (str): The CSV file, as passed to ``publish``.
+            name (str, optional): The segment name. Defaults to
+                ``segment_name(path)``.
+
+        Raises:
+            FileNotFoundError: If nothing was published under that name.
+            ValueError: If the segment does not hold a complete dataset.
+        """
+        self.path = path
+        name = name or segment_name(path)
+        if TRACK_PARAMETER:
+            self.__segment = shared_memory.SharedMemory(name, track=False)
+        else:
+            self.__segment = shared_memory.SharedMemory(name)
+        try:
+            super().__init__(self.__segment.buf.toreadonly())
+        except ValueError:
+            self.__segment.close()
+            raise
+
+    def close(self) -> None:
+        """Detach from the segment, leaving it published."""
+        self.release()
+        self.__segment.close()
+
+    def __enter__(self) -> "SharedDataset":
+        """Return the dataset itself for use in a ``with`` block."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Detach from the segment when leaving a ``with`` block."""
+        self.close()
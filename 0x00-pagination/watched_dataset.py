@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Hot-reloading CSV dataset.
+
+This module provides a list-like view of a CSV file that notices when the
+file changes. When rows are appended, only the new bytes are parsed;
+any other change reloads the whole file. Every change publishes a new
+list of rows instead of mutating the current one, so a request that
+took a snapshot keeps reading consistent rows while the file moves on.
+"""
+import csv
+import io
+import os
+from threading import Lock
+from time import monotonic
+from typing import List, Optional, Sequence, Tuple, Union
+
+
+class WatchedDataset(Sequence):
+    """A list-like view of CSV rows that follows changes to the file.
+
+    The file is checked with ``os.stat`` at most once per ``interval``
+    seconds, when a snapshot is taken. If it grew and the bytes already
+    read are still in place, the appended lines are parsed and added to a
+    copy of the rows; otherwise, including when it changed without
+    growing, the file is parsed again from scratch. An appended line
+    without its newline is left for a later check.
+
+    Rows must fit on a single line, as with ``MappedDataset``.
+
+    Attributes:
+        path (str): The path to the CSV file.
+        interval (Optional[float]): The seconds between two checks, or None
+            to only check when ``refresh`` is called.
+        generation (int): Incremented every time the rows change.
+        rewritten (int): The generation of the last full reload. Data
+            derived from generation ``g`` can be extended with the new
+            rows as long as ``rewritten <= g``.
+    """
+    TAIL = 64
+
+    def __init__(self, path: str, interval: Optional[float] = 1.0,
+                 skip_header: bool = True):
+        """Parse the whole file.
+
+        Args:
+            path (str): The path to the CSV file.
+            interval (float, optional): The seconds between two checks.
+                Defaults to 1.0.
+            skip_header (bool, optional): Whether the first line is a header
+                that should not be exposed as a row. Defaults to True.
+        """
+        self.path = path
+        self.interval = interval
+        self.generation = 0
+        self.rewritten = 0
+        self.__skip = skip_header
+        self.__lock = Lock()
+        self.__checked = monotonic()
+        self._load()
+
+    def _stamp(self) -> Tuple[int, int, int]:
+        """Return the inode, size and modification time of the file."""
+        stat = os.stat(self.path)
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _parse(self, start: int,
+               final: bool = False) -> Tuple[List[List], int, bytes]:
+        """Parse the complete lines from byte ``start`` on.
+
+        Args:
+            start (int): The byte offset to read from.
+            final (bool): Whether to parse a trailing line without its
+                newline too, as the last row of the file.
+
+        Returns:
+            Tuple[List[List], int, bytes]: The rows, the offset after the
+                last complete line, and the bytes just before that offset.
+        """
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        text = data if final else data[:end]
+        data = data[:end]
+        rows = list(csv.reader(io.StringIO(text.decode("utf-8"),
+                                           newline="")))
+        tail = data[-self.TAIL:]
+        if len(tail) < self.TAIL and start:
+            tail = self._read(start - self.TAIL + len(tail), start) + tail
+        return rows, start + end, tail
+
+    def _read(self, start: int, end: int) -> bytes:
+        """Return the bytes of the file in ``[start, end)``."""
+        start = max(start, 0)
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    def _load(self) -> None:
+        """Parse the whole file and publish its rows.
+
+        A last line without its newline is published as a row, as the csv
+        module would; since an append could still complete it, the next
+        change of the file reloads it from scratch.
+        """
+        stamp = self._stamp()
+        rows, offset, tail = self._parse(0, final=True)
+        self.__partial = offset < stamp[1]
+        self.__rows = rows[1:] if self.__skip else rows
+        self.__offset = offset
+        self.__tail = tail
+        self.__stamp = stamp
+
+    def refresh(self) -> bool:
+        """Check the file now and publish its new rows if it changed.
+
+        Returns:
+            bool: Whether the rows changed.
+        """
+        with self.__lock:
+            self.__checked = monotonic()
+            stamp = self._stamp()
+            if stamp == self.__stamp:
+                return False
+            inode, size, _ = stamp
+            offset = self.__offset
+            tail = self.__tail
+            if (inode == self.__stamp[0] and size > offset
+                    and not self.__partial
+                    and self._read(offset - len(tail), offset) == tail):
+                rows, offset, tail = self._parse(offset)
+                self.__stamp = stamp
+                if not rows:
+                    return False
+                self.__rows = self.__rows + rows
+                self.__offset = offset
+                self.__tail = tail
+            else:
+                self._load()
+                self.rewritten = self.generation + 1
+            self.generation += 1
+            return True
+
+    def snapshot(self) -> List[List]:
+        """Return the current rows, checking the file if it is time to.
+
+        The returned list is never modified: later changes publish a new
+        one.
+
+        Returns:
+            List[List]: The rows of the file.
+        """
+        interval = self.interval
+        if interval is not None and monotonic() - self.__checked >= interval:
+            self.refresh()
+        return self.__rows
+
+    def __len__(self) -> int:
+        """Return the number of rows of the current snapshot."""
+        return len(self.snapshot())
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[List, List[List]]:
+        """Return a row or a slice of rows of the current snapshot."""
+        return self.snapshot()[index]
@@ -3,7 +3,7 @@
 '''Task 0: Basic dictionary
 '''
 
-from base_caching import BaseCaching
+from base_caching import NEGATIVE, BaseCaching
 
 
 class BasicCache(BaseCaching):
@@ -12,17 +12,63 @@ class BasicCache(BaseCaching):
     the put and get methods using a dictionary
     """
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
         Stores an item in the cache with the given
-        key
+        key, expiring after `ttl` seconds as in
+        BaseCaching.put
         """
         if key is not None and item is not None:
+            if key not in self.cache_data:
+                self.counters.inserts += 1
             self.cache_data[key] = item
+            self._schedule(key, ttl)
 
     def get(self, key):
         """
         Retrieves an item from the cache with the
         given key
         """
-        return self.cache_data.get(key, None)
+        return self.get_many([key])[0]
+
+    def delete(self, key):
+        """
+        Removes the item stored with the given key,
+        returning whether there was one
+        """
+        if key not in self.cache_data:
+            return False
+        self._remove(key)
+        return True
+
+    def put_many(self, mapping, ttl=None):
+        """
+        Stores several items in the cache, all with
+        the same `ttl`; nothing is ever evicted, so
+        the returned list is always empty
+        """
+        if hasattr(mapping, "items"):
+            mapping = mapping.items()
+        for key, item in mapping:
+            self.put(key, item, ttl)
+        return []
+
+    def get_many(self, keys):
+        """
+        Retrieves the items stored with the given
+        keys, None for the missing ones
+        """
+        if self.wheel is not None:
+            self._reap()
+        items = []
+        for key in keys:
+            item = self.cache_data.get(key, None)
+            if (item is not None and self.wheel is not None and
+                    self._expired(key)):
+                item = None
+            if item is not None:
+                self.counters.hits += 1
+            elif key is not None:
+                self.counters.misses += 1
+            items.append(None if item is NEGATIVE else item)
+        return items
@@ -5,9 +5,8 @@ This module contains a class that implements a FIFO caching system.
 """
 
 
-from collections import OrderedDict
-
 from base_caching import BaseCaching
+from eviction_policies import FIFOPolicy
 
 
 class FIFOCache(BaseCaching):
@@ -18,34 +17,18 @@ class FIFOCache(BaseCaching):
     cache is full.
     """
 
-    def __init__(self):
+    def __init__(self, capacity=None, max_size=None, sizeof=None):
         """Initialize the cache.
 
-        The cache is initialized as an ordered dictionary with a maximum
-        size set by the MAX_ITEMS constant from the BaseCaching class.
-        """
-        super().__init__()
-        self.cache_data = OrderedDict()
-
-    def put(self, key, item):
-        """Store an item in the cache.
+        The storage and the size bounds are handled by BaseCaching, and the
+        insertion order is tracked by a FIFOPolicy.
 
-        If the key is None or the item is None, the method does nothing.
-        Otherwise, the item is stored in the cache. If the cache is full,
-        the oldest item is discarded first (FIFO) before adding the new
-        item.
-        """
-        if key is None or item is None:
-            return
-        self.cache_data[key] = item
-        if len(self.cache_data) > BaseCaching.MAX_ITEMS:
-            first_key, _ = self.cache_data.popitem(False)
-            print("DISCARD:", first_key)
-
-    def get(self, key):
-        """Retrieve an item from the cache.
-
-        If the key is None or the item does not exist in the cache, the
-        method returns None.
+        Args:
+            capacity (int): The maximum number of items. Defaults to the
+                MAX_ITEMS constant from the BaseCaching class.
+            max_size (int): The maximum total size of the items, as
+                estimated by `sizeof`. Defaults to no size bound.
+            sizeof (callable): Estimates the size of an item. Defaults to
+                `sys.getsizeof`.
         """
-        return self.cache_data.get(key, None)
+        super().__init__(capacity, max_size, sizeof, policy=FIFOPolicy())
@@ -3,34 +3,54 @@
 from threading import RLock
 
 BaseCaching = __import__('base_caching').BaseCaching
+LFUPolicy = __import__('eviction_policies').LFUPolicy
 
 
 class LFUCache(BaseCaching):
     """
     A class that inherits from BaseCaching and is a LFU caching system.
 
+    The LFUPolicy groups keys in frequency buckets, each one kept from least
+    to most recently used, and tracks the lowest frequency. Finding the
+    victim is therefore O(1), and ties between keys with the same frequency
+    evict the least recently used one.
+
     It has the following methods:
         - put: Adds a key/value pair to the cache.
         - get: Retrieves a value from the cache.
-        - _balance: Balances the cache by removing the least frequently used
-            item if the cache is full.
+        - delete: Removes a key/value pair from the cache.
+        - put_many: Adds several key/value pairs under one lock acquisition.
+        - get_many: Retrieves several values under one lock acquisition.
+        - is_negative, reap: The TTL helpers of BaseCaching, under the lock.
+        - snapshot, restore, warm: Save and reload the items with their
+            frequencies, under the lock.
     """
 
-    def __init__(self):
+    def __init__(self, capacity=None, max_size=None, sizeof=None,
+                 decay_every=None):
         """
         Initializes the LFUCache instance.
 
-        It calls the parent's __init__ method and initializes the following
-        attributes:
-            - __stats: A dictionary that maps keys to their frequency of usage.
+        It calls the parent's __init__ method with a LFUPolicy and
+        initializes the following attributes:
             - __rlock: A RLock object that is used to synchronize access to the
                 cache.
+
+        Args:
+            capacity (int): The maximum number of items. Defaults to
+                MAX_ITEMS.
+            max_size (int): The maximum total size of the items, as estimated
+                by `sizeof`. Defaults to no size bound.
+            sizeof (callable): Estimates the size of an item.
+            decay_every (int): If set, every `decay_every` accesses all the
+                frequencies are halved so that keys which were hot long ago
+                do not pin the cache forever. Defaults to None (no aging).
         """
-        super().__init__()
-        self.__stats = {}
+        super().__init__(capacity, max_size, sizeof,
+                         policy=LFUPolicy(decay_every))
         self.__rlock = RLock()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
         Adds a key/value pair to the cache.
 
@@ -40,13 +60,11 @@ class LFUCache(BaseCaching):
         Args:
             key (str): The key of the item to add.
             item (object): The item to add.
+            ttl (float): The seconds after which the item expires. Defaults
+                to `default_ttl`.
         """
-        if key is not None and item is not None:
-            keyOut = self._balance(key)
-            with self.__rlock:
-                self.cache_data.update({key: item})
-            if keyOut is not None:
-                print('DISCARD: {}'.format(keyOut))
+        with self.__rlock:
+            super().put(key, item, ttl)
 
     def get(self, key):
         """
@@ -62,32 +80,110 @@ class LFUCache(BaseCaching):
                 in the cache.
         """
         with self.__rlock:
-            value = self.cache_data.get(key, None)
-            if key in self.__stats:
-                self.__stats[key] += 1
-        return value
+            return super().get(key)
+
+    def delete(self, key):
+        """
+        Removes a key/value pair from the cache.
+
+        Args:
+            key (str): The key of the item to remove.
+
+        Returns:
+            bool: True if the key was cached.
+        """
+        with self.__rlock:
+            return super().delete(key)
+
+    def put_many(self, mapping, ttl=None):
+        """
+        Adds several key/value pairs to the cache under a single lock
+        acquisition.
+
+        Args:
+            mapping (dict): The items to add, or an iterable of (key, item)
+                pairs.
+            ttl (float): The seconds after which the items expire. Defaults
+                to `default_ttl`.
+
+        Returns:
+            list: The keys that were evicted to make room, in order.
+        """
+        with self.__rlock:
+            return super().put_many(mapping, ttl)
+
+    def get_many(self, keys):
+        """
+        Retrieves several values from the cache under a single lock
+        acquisition.
+
+        Args:
+            keys (list): The keys of the items to retrieve.
+
+        Returns:
+            list: The items, with None for the keys that are not cached.
+        """
+        with self.__rlock:
+            return super().get_many(keys)
 
-    def _balance(self, keyIn):
+    def is_negative(self, key):
         """
-        Balances the cache by removing the least frequently used item if the
-        cache is full.
+        Tells whether a key is cached as known to be missing.
 
-        If the cache is full, it removes the least frequently used item and
-        returns its key. Otherwise, it returns None.
+        Args:
+            key (str): The key to check.
+
+        Returns:
+            bool: True if `put_negative` was called for the key and the entry
+                has not expired or been evicted.
+        """
+        with self.__rlock:
+            return super().is_negative(key)
+
+    def reap(self):
+        """
+        Removes every expired item under the lock.
+
+        Returns:
+            int: The number of items that expired.
+        """
+        with self.__rlock:
+            return super().reap()
+
+    def snapshot(self, path):
+        """
+        Writes the items and their frequencies to a file under the lock.
+
+        Args:
+            path (str): The file to write.
+
+        Returns:
+            int: The number of items written.
+        """
+        with self.__rlock:
+            return super().snapshot(path)
+
+    def restore(self, path, lazy=False):
+        """
+        Loads a file written by snapshot under the lock.
+
+        Args:
+            path (str): The file to read.
+            lazy (bool): Whether to restore the items a chunk at a time
+                during the following operations.
+        """
+        with self.__rlock:
+            super().restore(path, lazy)
+
+    def warm(self, chunks=1):
+        """
+        Continues a lazy restore under the lock.
 
         Args:
-            keyIn (str): The key of the item that is being added to the cache.
+            chunks (int): The number of chunks to restore, or None for all.
 
         Returns:
-            str: The key of the item that was removed or None if the cache is
-                not full.
+            bool: True once the whole file was restored.
         """
-        keyOut = None
         with self.__rlock:
-            if keyIn not in self.__stats:
-                if len(self.cache_data) == BaseCaching.MAX_ITEMS:
-                    keyOut = min(self.__stats, key=self.__stats.get)
-                    self.cache_data.pop(keyOut)
-                    self.__stats.pop(keyOut)
-            self.__stats[keyIn] = self.__stats.get(keyIn, 0) + 1
-        return keyOut
+            return super().warm(chunks)
@@ -0,0 +1,27 @@
+#!/usr/bin/python3
+"""
+Module 101-arc_cache.py
+"""
+from base_caching import BaseCaching
+from eviction_policies import ARCPolicy
+
+
+class ARCCache(BaseCaching):
+    """
+    Class ARCCache that inherits from BaseCaching and is an Adaptive
+    Replacement Cache
+
+    It balances recency and frequency on its own: keys seen once and keys
+    seen again are kept in separate lists whose sizes adapt to the
+    workload, so a large sequential scan cannot flush the hot keys.
+    """
+    def __init__(self, capacity=None, max_size=None, sizeof=None):
+        """
+        Initialize the cache
+
+        Args:
+            capacity (int): the maximum number of items, MAX_ITEMS by default
+            max_size (int): the maximum total size of the items
+            sizeof (callable): estimates the size of an item
+        """
+        super().__init__(capacity, max_size, sizeof, policy=ARCPolicy())
@@ -0,0 +1,28 @@
+#!/usr/bin/python3
+"""
+Module 102-two_queue_cache.py
+"""
+from base_caching import BaseCaching
+from eviction_policies import TwoQueuePolicy
+
+
+class TwoQueueCache(BaseCaching):
+    """
+    Class TwoQueueCache that inherits from BaseCaching and is a 2Q caching
+    system
+
+    New keys wait in a FIFO queue and are only promoted to the main LRU
+    list when they are requested again soon after leaving it, so keys read
+    once by a scan never displace the hot ones.
+    """
+    def __init__(self, capacity=None, max_size=None, sizeof=None):
+        """
+        Initialize the cache
+
+        Args:
+            capacity (int): the maximum number of items, MAX_ITEMS by default
+            max_size (int): the maximum total size of the items
+            sizeof (callable): estimates the size of an item
+        """
+        super().__init__(capacity, max_size, sizeof,
+                         policy=TwoQueuePolicy())
@@ -0,0 +1,27 @@
+#!/usr/bin/python3
+"""
+Module 103-tinylfu_cache.py
+"""
+from base_caching import BaseCaching
+from eviction_policies import TinyLFUPolicy
+
+
+class TinyLFUCache(BaseCaching):
+    """
+    Class TinyLFUCache that inherits from BaseCaching and is a W-TinyLFU
+    caching system
+
+    New keys go through a small LRU window, then have to beat the main
+    victim's estimated access frequency, kept in a count-min sketch, to be
+    admitted, so rarely used keys cannot push out popular ones.
+    """
+    def __init__(self, capacity=None, max_size=None, sizeof=None):
+        """
+        Initialize the cache
+
+        Args:
+            capacity (int): the maximum number of items, MAX_ITEMS by default
+            max_size (int): the maximum total size of the items
+            sizeof (callable): estimates the size of an item
+        """
+        super().__init__(capacity, max_size, sizeof, policy=TinyLFUPolicy())
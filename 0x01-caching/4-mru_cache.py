@@ -5,9 +5,8 @@ A class that inherits from BaseCaching and is a most recently used (MRU)
 cache system.
 """
 
-from collections import OrderedDict
-
 from base_caching import BaseCaching
+from eviction_policies import MRUPolicy
 
 
 class MRUCache(BaseCaching):
@@ -16,41 +15,12 @@ class MRUCache(BaseCaching):
     (MRU) cache system.
     """
 
-    def __init__(self):
+    def __init__(self, capacity=None, max_size=None, sizeof=None):
         """
         Initialize the MRUCache class by calling the parent class's
-        __init__() method and creating an empty OrderedDict that will store
-        the cache data.
-        """
-        super().__init__()
-        self.cache_data = OrderedDict()
-
-    def put(self, key, item):
-        """
-        Add a key-value pair to the cache data if the key is not already in
-        the cache data. If the cache data is full, remove the most recently
-        used item (the last item in the OrderedDict) and add the new
-        key-value pair. If the key is already in the cache data, update the
-        value associated with the key.
-        """
-        if key is None or item is None:
-            return
-
-        if key not in self.cache_data:
-            if len(self.cache_data) + 1 > BaseCaching.MAX_ITEMS:
-                mru_key, _ = self.cache_data.popitem(False)
-                print("DISCARD:", mru_key)
-
-            self.cache_data[key] = item
-            self.cache_data.move_to_end(key, last=False)
-        else:
-            self.cache_data[key] = item
-
-    def get(self, key):
-        """
-        Return the value associated with the given key if it exists in the
-        cache data. If the key does not exist, return None.
+        __init__() method with an MRUPolicy. Adding a new key or reading one
+        makes it the most recently used; updating the value of a cached key
+        does not. When the cache is full, the most recently used key is
+        discarded before the new one is added.
         """
-        if key is not None and key in self.cache_data:
-            self.cache_data.move_to_end(key, last=False)
-        return self.cache_data.get(key, None)
+        super().__init__(capacity, max_size, sizeof, policy=MRUPolicy())
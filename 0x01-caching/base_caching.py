@@ -1,18 +1,103 @@
 #!/usr/bin/python3
 """ BaseCaching module
 """
+import os
+import pickle
+import struct
+import sys
+from time import monotonic, perf_counter_ns
+
+from cache_events import EVICTED, EXPIRED
+from cache_stats import CacheStats
+from timer_wheel import TimerWheel
+
+SNAPSHOT_MAGIC = b"CACHESNP"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<8sH")
+
+
+class Negative():
+    """ Type of NEGATIVE, the item cached for keys known to be missing
+    """
+
+    def __repr__(self):
+        """ Printable form
+        """
+        return "NEGATIVE"
+
+    def __reduce__(self):
+        """ Unpickle as the NEGATIVE singleton
+        """
+        return "NEGATIVE"
+
+
+NEGATIVE = Negative()
+
 
 class BaseCaching():
     """ BaseCaching defines:
       - constants of your caching system
       - where your data are stored (in a dictionary)
+      - the shared storage core used by the eviction policies
+      - the eviction listeners and the statistics of the cache
+      - the expiry of items after a time to live, in seconds
+      - snapshots of the items and the policy metadata, for warm restarts
     """
     MAX_ITEMS = 4
+    TRACK_LATENCY = False
+    DEFAULT_TTL = None
+    NEGATIVE_TTL = None
+    TTL_TICK = 1.0
+    SNAPSHOT_CHUNK = 1024
 
-    def __init__(self):
+    def __init__(self, capacity=None, max_size=None, sizeof=None,
+                 policy=None):
         """ Initiliaze
+
+        `capacity` bounds the number of items (MAX_ITEMS by default, or no
+        bound when only `max_size` is given). `max_size` bounds the sum of
+        `sizeof(item)` over the cached items, `sys.getsizeof` by default.
+        `policy` is the EvictionPolicy choosing what to evict; without one,
+        put and get must be implemented by the subclass.
         """
         self.cache_data = {}
+        if capacity is None and max_size is None:
+            capacity = self.MAX_ITEMS
+        self.capacity = capacity
+        self.max_size = max_size
+        self.sizeof = sizeof or sys.getsizeof
+        self.size = 0
+        self.sizes = {} if max_size is not None else None
+        self.policy = policy
+        self.listeners = []
+        self.counters = CacheStats()
+        self.track_latency = self.TRACK_LATENCY
+        self.default_ttl = self.DEFAULT_TTL
+        self.negative_ttl = self.NEGATIVE_TTL
+        self.clock = monotonic
+        self.wheel = None
+        self.restoring = None
+        self.restore_skip = None
+        if policy is not None:
+            policy.bind(self)
+
+    def add_listener(self, listener):
+        """ Call `listener(key, item, cause)` whenever an item is evicted
+
+        `cache_events.print_discard` restores the DISCARD printing.
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """ Stop calling `listener`
+        """
+        self.listeners.remove(listener)
+
+    def stats(self):
+        """ Hits, misses, inserts, evictions and, when `track_latency` is
+        set, latency percentiles per operation
+        """
+        return self.counters.as_dict()
 
     def print_cache(self):
         """ Print the cache
@@ -21,12 +106,437 @@ class BaseCaching():
         for key in sorted(self.cache_data.keys()):
             print("{}: {}".format(key, self.cache_data.get(key)))
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """ Add an item in the cache
+
+        The item expires after `ttl` seconds, `default_ttl` by default, or
+        never when both are None.
+        """
+        if self.policy is None:
+            raise NotImplementedError(
+                "put must be implemented in your cache class")
+        if key is None or item is None:
+            return
+        if self.track_latency:
+            start = perf_counter_ns()
+            self._store(key, item, ttl)
+            self.counters.record("put", perf_counter_ns() - start)
+        else:
+            self._store(key, item, ttl)
+
+    def put_negative(self, key, ttl=None):
+        """ Remember that `key` has no item, for `ttl` seconds
+
+        `negative_ttl` is used by default, then `default_ttl`. get returns
+        None for the key, and is_negative tells it apart from a miss.
+        """
+        self.put(key, NEGATIVE, self.negative_ttl if ttl is None else ttl)
+
+    def is_negative(self, key):
+        """ Whether `key` is cached as known to be missing
+        """
+        if self.wheel is not None and self._expired(key):
+            return False
+        return self.cache_data.get(key) is NEGATIVE
+
+    def reap(self):
+        """ Remove every expired item now, returning how many there were
+
+        Expired items are otherwise removed as the cache is used; call this
+        from a timer to clean up a cache that sits idle.
         """
-        raise NotImplementedError("put must be implemented in your cache class")
+        if self.wheel is None:
+            return 0
+        return self._reap()
 
     def get(self, key):
         """ Get an item by key
         """
-        raise NotImplementedError("get must be implemented in your cache class")
+        if self.policy is None:
+            raise NotImplementedError(
+                "get must be implemented in your cache class")
+        if self.track_latency:
+            start = perf_counter_ns()
+            item = self._lookup(key)
+            self.counters.record("get", perf_counter_ns() - start)
+            return item
+        return self._lookup(key)
+
+    def delete(self, key):
+        """ Remove an item by key, returning whether it was cached
+
+        Listeners are not called: the item did not leave on its own.
+        """
+        if self.policy is None:
+            raise NotImplementedError(
+                "delete must be implemented in your cache class")
+        if self.restoring is not None:
+            self._warm(key)
+        if key not in self.cache_data:
+            return False
+        self._remove(key)
+        self.policy.discard(key)
+        return True
+
+    def _lookup(self, key):
+        """ Read an item and report the hit or the miss
+        """
+        if self.restoring is not None:
+            self._warm()
+        if self.wheel is not None:
+            self._reap()
+        item = self.cache_data.get(key)
+        if item is not None and self.wheel is not None and self._expired(key):
+            item = None
+        if item is not None:
+            self.counters.hits += 1
+            self.policy.touch(key)
+        elif key is not None:
+            self.counters.misses += 1
+            self.policy.miss(key)
+        return None if item is NEGATIVE else item
+
+    def get_many(self, keys):
+        """ Get several items at once, None for the missing ones
+
+        Runs of hits are reported to the policy in one touch_many call.
+        """
+        if self.policy is None:
+            raise NotImplementedError(
+                "get_many must be implemented in your cache class")
+        if self.restoring is not None:
+            self._warm()
+        data = self.cache_data
+        policy = self.policy
+        wheel = self.wheel
+        if wheel is not None:
+            self._reap()
+        items = []
+        hits = []
+        for key in keys:
+            item = data.get(key)
+            if item is not None and wheel is not None and self._expired(key):
+                item = None
+            if item is not None:
+                hits.append(key)
+            elif key is not None:
+                if hits:
+                    self.counters.hits += len(hits)
+                    policy.touch_many(hits)
+                    hits = []
+                self.counters.misses += 1
+                policy.miss(key)
+            items.append(None if item is NEGATIVE else item)
+        if hits:
+            self.counters.hits += len(hits)
+            policy.touch_many(hits)
+        return items
+
+    def put_many(self, mapping, ttl=None):
+        """ Add several items at once and return the evicted keys
+
+        `mapping` is a dict or an iterable of (key, item) pairs; pairs
+        with a None key or item are skipped, as with put. Every item gets
+        the same `ttl`.
+        """
+        if self.policy is None:
+            raise NotImplementedError(
+                "put_many must be implemented in your cache class")
+        if hasattr(mapping, "items"):
+            mapping = mapping.items()
+        store = self._store
+        evicted = []
+        for key, item in mapping:
+            if key is not None and item is not None:
+                evicted.extend(store(key, item, ttl))
+        return evicted
+
+    def _store(self, key, item, ttl=None):
+        """ Insert or update an item, evicting as the policy decides
+
+        Room is made before a new key is inserted, so that policies such as
+        LIFO or MRU never pick the incoming key. An update that no longer
+        fits in `max_size` is handled the same way: the key is taken out
+        first and inserted again, with fresh policy metadata, once there is
+        room. An item larger than `max_size` on its own is not cached.
+
+        Returns the list of evicted keys.
+        """
+        if self.restoring is not None:
+            self._warm(key)
+        if self.wheel is not None:
+            self._reap()
+        data = self.cache_data
+        evicted = []
+        size = 0
+        if self.sizes is not None:
+            size = self.sizeof(item)
+            if size > self.max_size:
+                if key in data:
+                    self._remove(key)
+                    self.policy.discard(key)
+                return evicted
+        cached = key in data
+        if cached:
+            if (self.sizes is None or
+                    self.size - self.sizes[key] + size <= self.max_size):
+                self.policy.update(key)
+                data[key] = item
+                self._schedule(key, ttl)
+                if self.sizes is not None:
+                    self.size += size - self.sizes[key]
+                    self.sizes[key] = size
+                return evicted
+            self._remove(key)
+            self.policy.discard(key)
+        while data and self._full(size):
+            evicted.append(self._evict(key))
+        self.policy.admit(key)
+        data[key] = item
+        if not cached:
+            self.counters.inserts += 1
+        self._schedule(key, ttl)
+        if self.sizes is not None:
+            self.sizes[key] = size
+            self.size += size
+        return evicted
+
+    def snapshot(self, path):
+        """ Write the items and the policy metadata to `path`
+
+        The file holds a short versioned header, the pickled metadata of
+        the policy, then pickled chunks of (key, item, meta, ttl) records
+        from the key the policy would evict last to the one it would evict
+        first, where `ttl` is the number of seconds left to live or None.
+        Records are pickled as the policy yields them, so no second copy
+        of the cache is built. The file is written next to `path` and
+        renamed over it once complete.
+
+        Returns the number of items written.
+        """
+        if self.restoring is not None:
+            self.warm(None)
+        if self.wheel is not None:
+            self._reap()
+        if self.policy is None:
+            records = ((key, None) for key in self.cache_data)
+        else:
+            records = self.policy.state()
+        header = {
+            "policy": type(self.policy).__name__,
+            "meta": None if self.policy is None else self.policy.dump(),
+        }
+        now = self.clock()
+        written = 0
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION))
+                pickle.dump(header, f, pickle.HIGHEST_PROTOCOL)
+                chunk = []
+                for key, meta in records:
+                    ttl = None
+                    if self.wheel is not None:
+                        deadline = self.wheel.deadline(key)
+                        if deadline is not None:
+                            ttl = deadline - now
+                    chunk.append((key, self.cache_data[key], meta, ttl))
+                    if len(chunk) == self.SNAPSHOT_CHUNK:
+                        pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+                        written += len(chunk)
+                        chunk = []
+                chunk.append(None)
+                pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+                written += len(chunk) - 1
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return written
+
+    def restore(self, path, lazy=False):
+        """ Load a file written by snapshot into the cache
+
+        Keys already cached are kept as they are, and restored keys go
+        behind them in the eviction order, so restoring into a cache that
+        is in use never evicts live items; once the cache is full, the
+        rest of the file, the keys the policy valued least, is dropped.
+        Items whose time to live ran out are skipped.
+
+        With `lazy`, only the header is read now; one chunk is then
+        restored on each later get, put or delete, or by calling warm, so
+        the cache serves requests while it warms up. Keys written or
+        deleted meanwhile are not restored. A truncated file stops the
+        warm-up quietly in that case, and raises ValueError otherwise.
+        A cache without a policy always restores at once, since its own
+        get and put do not drive the warm-up.
+
+        The file is unpickled: only restore snapshots you wrote. Raises
+        ValueError if it is not a snapshot of a cache with the same policy.
+        """
+        f = open(path, "rb")
+        try:
+            magic, version = SNAPSHOT_HEADER.unpack(
+                f.read(SNAPSHOT_HEADER.size).ljust(SNAPSHOT_HEADER.size,
+                                                   b"\0"))
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError("{} is not a cache snapshot".format(path))
+            if version != SNAPSHOT_VERSION:
+                raise ValueError("unsupported snapshot version {}".format(
+                    version))
+            header = pickle.load(f)
+            if header["policy"] != type(self.policy).__name__:
+                raise ValueError("{} is a snapshot of a {} cache".format(
+                    path, header["policy"]))
+        except BaseException:
+            f.close()
+            raise
+        if self.restoring is not None:
+            self.restoring.close()
+        if self.policy is not None and header["meta"] is not None:
+            self.policy.load(header["meta"])
+        lazy = lazy and self.policy is not None
+        self.restore_skip = set()
+        self.restoring = self._restore_chunks(f, lazy)
+        if not lazy:
+            self.warm(None)
+
+    def warm(self, chunks=1):
+        """ Restore up to `chunks` more chunks of a lazy restore, all of
+        them if None, and return whether the warm-up is over
+        """
+        while self.restoring is not None and chunks != 0:
+            try:
+                next(self.restoring)
+            except StopIteration:
+                self.restoring = None
+            except BaseException:
+                self.restoring = None
+                self.restore_skip = None
+                raise
+            if chunks is not None:
+                chunks -= 1
+        if self.restoring is None:
+            self.restore_skip = None
+        return self.restoring is None
+
+    def _warm(self, key=None):
+        """ Restore one chunk before an operation; `key` is being written
+        or deleted, so its saved item is stale
+        """
+        if key is not None:
+            self.restore_skip.add(key)
+        self.warm(1)
+
+    def _restore_chunks(self, f, quiet):
+        """ Restore the records of `f` one chunk per iteration
+        """
+        with f:
+            while True:
+                try:
+                    chunk = pickle.load(f)
+                except (EOFError, pickle.UnpicklingError):
+                    if quiet:
+                        return
+                    raise ValueError("truncated cache snapshot")
+                for record in chunk:
+                    if record is None or not self._restore_item(*record):
+                        return
+                yield
+
+    def _restore_item(self, key, item, meta, ttl):
+        """ Insert one saved record behind the cached keys
+
+        Returns False once the cache is full; a cache without a policy
+        takes everything, as its put does.
+        """
+        data = self.cache_data
+        if key in data or key in self.restore_skip:
+            return True
+        if ttl is not None and ttl <= 0:
+            return True
+        size = 0
+        if self.sizes is not None:
+            size = self.sizeof(item)
+            if size > self.max_size:
+                return True
+        if self.policy is not None:
+            if self._full(size):
+                return False
+            self.policy.restore(key, meta)
+        data[key] = item
+        if ttl is not None:
+            self._schedule(key, ttl)
+        if self.sizes is not None:
+            self.sizes[key] = size
+            self.size += size
+        return True
+
+    def _schedule(self, key, ttl):
+        """ Set or clear the deadline of a key that was just written
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+        if ttl is None:
+            if self.wheel is not None:
+                self.wheel.cancel(key)
+            return
+        if self.wheel is None:
+            self.wheel = TimerWheel(self.TTL_TICK, self.clock())
+        self.wheel.schedule(key, self.clock() + ttl)
+
+    def _expired(self, key):
+        """ Remove `key` if its deadline has passed, and say so
+        """
+        deadline = self.wheel.deadline(key)
+        if deadline is None or deadline > self.clock():
+            return False
+        self.wheel.cancel(key)
+        self._expire(key)
+        return True
+
+    def _reap(self):
+        """ Remove the items whose deadline passed a whole tick ago
+        """
+        expired = self.wheel.advance(self.clock())
+        for key in expired:
+            self._expire(key)
+        return len(expired)
+
+    def _expire(self, key):
+        """ Remove an expired item and tell the listeners
+        """
+        item = self._remove(key)
+        if self.policy is not None:
+            self.policy.discard(key)
+        self.counters.expirations += 1
+        for listener in self.listeners:
+            listener(key, item, EXPIRED)
+
+    def _full(self, size):
+        """ Whether a new item of `size` would exceed a bound
+        """
+        if self.capacity is not None and len(self.cache_data) >= self.capacity:
+            return True
+        return self.sizes is not None and self.size + size > self.max_size
+
+    def _evict(self, incoming):
+        """ Remove the policy's victim to make room for `incoming`
+        """
+        victim = self.policy.evict(incoming)
+        item = self._remove(victim)
+        self.counters.evictions += 1
+        for listener in self.listeners:
+            listener(victim, item, EVICTED)
+        return victim
+
+    def _remove(self, key):
+        """ Drop a key from the storage and the size accounting
+        """
+        item = self.cache_data.pop(key)
+        if self.sizes is not None:
+            self.size -= self.sizes.pop(key)
+        if self.wheel is not None:
+            self.wheel.cancel(key)
+        return item
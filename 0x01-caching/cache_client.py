@@ -0,0 +1,306 @@
+#!/usr/bin/python3
+""" CacheClient module
+
+An asyncio client spreading keys over several cache nodes.
+"""
+import asyncio
+import bisect
+import hashlib
+import json
+from collections import deque
+
+from cache_protocol import (DELETE, ERROR, GET, NOT_FOUND, OK, PUT, RESPONSE,
+                            STATS, encode_key, request)
+
+
+class NodeError(ConnectionError):
+    """ A node failed, timed out or answered with an error
+    """
+
+
+def ring_hash(data):
+    """ The 64-bit position of `data` on the hash ring
+    """
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(),
+                          "big")
+
+
+class Connection():
+    """ One pipelined connection to a node
+
+    Requests are written as soon as they are made and their futures are
+    queued; a reader task resolves them in order as the responses come
+    back. A failure fails every pending request and closes the
+    connection for good.
+    """
+
+    def __init__(self, reader, writer):
+        """ Initiliaze and start reading responses
+        """
+        self.reader = reader
+        self.writer = writer
+        self.pending = deque()
+        self.closed = False
+        self.task = asyncio.ensure_future(self._read_responses())
+
+    def send(self, frames):
+        """ Write `frames` at once and return one future per frame
+        """
+        if self.closed:
+            raise NodeError("connection closed")
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in frames]
+        self.pending.extend(futures)
+        self.writer.write(b"".join(frames))
+        return futures
+
+    async def _read_responses(self):
+        """ Resolve the pending futures with (status, value) pairs
+        """
+        try:
+            while True:
+                header = await self.reader.readexactly(RESPONSE.size)
+                status, length = RESPONSE.unpack(header)
+                value = await self.reader.readexactly(length)
+                future = self.pending.popleft()
+                if not future.done():
+                    future.set_result((status, value))
+        except (asyncio.IncompleteReadError, ConnectionError, IndexError,
+                asyncio.CancelledError) as error:
+            self.close(NodeError(str(error) or "connection lost"))
+
+    def close(self, error=None):
+        """ Close the connection, failing the pending requests
+        """
+        if self.closed:
+            return
+        self.closed = True
+        error = error or NodeError("connection closed")
+        while self.pending:
+            future = self.pending.popleft()
+            if not future.done():
+                future.set_exception(error)
+        self.writer.close()
+        if self.task is not asyncio.current_task():
+            self.task.cancel()
+
+
+class NodePool():
+    """ Up to `size` pipelined connections to one node, used in turn
+    """
+
+    def __init__(self, host, port, size=2, timeout=1.0):
+        """ Initiliaze without connecting
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.connections = [None] * size
+        self.turn = 0
+        self.lock = asyncio.Lock()
+
+    async def connection(self):
+        """ The next connection in turn, opened or reopened if needed
+        """
+        index = self.turn
+        self.turn = (index + 1) % len(self.connections)
+        connection = self.connections[index]
+        if connection is not None and not connection.closed:
+            return connection
+        async with self.lock:
+            connection = self.connections[index]
+            if connection is None or connection.closed:
+                try:
+                    reader, writer = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port),
+                        self.timeout)
+                except (OSError, asyncio.TimeoutError) as error:
+                    raise NodeError("{}:{}: {}".format(
+                        self.host, self.port, error or "timeout")) from error
+                connection = Connection(reader, writer)
+                self.connections[index] = connection
+        return connection
+
+    async def call(self, frames):
+        """ Send `frames` in one write and wait for their responses
+
+        A timeout closes the connection, since the responses still due on
+        it would be matched with the wrong requests.
+        """
+        connection = await self.connection()
+        futures = connection.send(frames)
+        try:
+            return await asyncio.wait_for(asyncio.gather(*futures),
+                                          self.timeout)
+        except asyncio.TimeoutError as error:
+            connection.close(NodeError("{}:{}: timeout".format(
+                self.host, self.port)))
+            raise NodeError("{}:{}: timeout".format(
+                self.host, self.port)) from error
+
+    async def close(self):
+        """ Close every connection
+        """
+        for connection in self.connections:
+            if connection is not None:
+                connection.close()
+        self.connections = [None] * len(self.connections)
+
+
+class CacheClient():
+    """ Client of several cache nodes placed on a consistent hash ring
+
+    Each node owns `vnodes` points of the ring and a key goes to the node
+    of the first point at or after its hash, so adding or removing a node
+    only moves about 1/n of the keys. Requests to one node share a small
+    pool of pipelined connections, and the keys of get_many and put_many
+    are batched into one write per node.
+
+    Keys are str or bytes and items are bytes. A node that fails or does
+    not answer within `timeout` seconds raises NodeError.
+    """
+
+    def __init__(self, nodes, vnodes=100, pool_size=2, timeout=1.0):
+        """ Initiliaze with `nodes`, a list of (host, port) pairs
+        """
+        self.vnodes = vnodes
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.pools = {}
+        self.ring = []
+        self.points = []
+        for host, port in nodes:
+            self.add_node(host, port)
+
+    def add_node(self, host, port):
+        """ Place a node on the ring
+        """
+        name = "{}:{}".format(host, port)
+        if name in self.pools:
+            return
+        self.pools[name] = NodePool(host, port, self.pool_size, self.timeout)
+        for vnode in range(self.vnodes):
+            point = ring_hash("{}#{}".format(name, vnode).encode("utf-8"))
+            self.ring.append((point, name))
+        self.ring.sort()
+        self.points = [point for point, _ in self.ring]
+
+    async def remove_node(self, host, port):
+        """ Take a node off the ring and close its connections
+        """
+        name = "{}:{}".format(host, port)
+        pool = self.pools.pop(name, None)
+        if pool is None:
+            return
+        self.ring = [entry for entry in self.ring if entry[1] != name]
+        self.points = [point for point, _ in self.ring]
+        await pool.close()
+
+    def node_for(self, key):
+        """ The "host:port" name of the node owning `key`
+        """
+        if not self.ring:
+            raise NodeError("no cache node")
+        index = bisect.bisect_left(self.points, ring_hash(encode_key(key)))
+        return self.ring[index % len(self.ring)][1]
+
+    @staticmethod
+    def _check(status, value):
+        """ Raise NodeError for an error response
+        """
+        if status == ERROR:
+            raise NodeError(value.decode("utf-8", "replace"))
+        return status
+
+    async def _call(self, key, frame):
+        """ Send one frame to the node of `key`
+        """
+        pool = self.pools[self.node_for(key)]
+        (status, value), = await pool.call([frame])
+        self._check(status, value)
+        return status, value
+
+    async def get(self, key):
+        """ The item of `key`, or None
+        """
+        status, value = await self._call(key, request(GET, key))
+        return value if status == OK else None
+
+    async def put(self, key, item, ttl=None):
+        """ Store `item` under `key`, for `ttl` seconds if given
+        """
+        await self._call(key, request(PUT, key, item, ttl))
+
+    async def delete(self, key):
+        """ Remove `key`, returning whether a node had it
+        """
+        status, _ = await self._call(key, request(DELETE, key))
+        return status != NOT_FOUND
+
+    def _by_node(self, keys):
+        """ Group the positions of `keys` by node
+        """
+        groups = {}
+        for position, key in enumerate(keys):
+            groups.setdefault(self.node_for(key), []).append(position)
+        return groups
+
+    async def get_many(self, keys):
+        """ The items of `keys`, None for the missing ones
+
+        Each node gets all its keys in one write, and the nodes are asked
+        concurrently.
+        """
+        keys = list(keys)
+        groups = self._by_node(keys)
+        items = [None] * len(keys)
+
+        async def fetch(name, positions):
+            """ Get the keys of one node
+            """
+            frames = [request(GET, keys[position]) for position in positions]
+            replies = await self.pools[name].call(frames)
+            for position, (status, value) in zip(positions, replies):
+                if self._check(status, value) == OK:
+                    items[position] = value
+
+        await asyncio.gather(*(fetch(name, positions)
+                               for name, positions in groups.items()))
+        return items
+
+    async def put_many(self, mapping, ttl=None):
+        """ Store several items, one write per node
+        """
+        if hasattr(mapping, "items"):
+            mapping = mapping.items()
+        pairs = list(mapping)
+        groups = self._by_node([key for key, _ in pairs])
+
+        async def store(name, positions):
+            """ Put the items of one node
+            """
+            frames = [request(PUT, pairs[position][0], pairs[position][1], ttl)
+                      for position in positions]
+            for status, value in await self.pools[name].call(frames):
+                self._check(status, value)
+
+        await asyncio.gather(*(store(name, positions)
+                               for name, positions in groups.items()))
+
+    async def stats(self):
+        """ The statistics of every node, by "host:port" name
+        """
+        names = list(self.pools)
+        replies = await asyncio.gather(
+            *(self.pools[name].call([request(STATS)]) for name in names))
+        stats = {}
+        for name, ((status, value),) in zip(names, replies):
+            self._check(status, value)
+            stats[name] = json.loads(value)
+        return stats
+
+    async def close(self):
+        """ Close the connections to every node
+        """
+        for pool in self.pools.values():
+            await pool.close()
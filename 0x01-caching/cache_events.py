@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+""" Cache events module
+
+Listeners are called as `listener(key, item, cause)` every time an item
+leaves a cache on its own, with `cause` one of the constants below.
+"""
+from queue import Empty, Full, Queue
+
+EVICTED = "evicted"
+EXPIRED = "expired"
+
+
+def print_discard(key, item, cause):
+    """ Legacy listener printing `DISCARD: <key>` for every eviction
+    """
+    if cause == EVICTED:
+        print("DISCARD: {}".format(key))
+
+
+class EvictionQueue():
+    """ Listener handing events over to a consumer through a bounded queue
+
+    The cache never blocks on a slow consumer: when the queue is full the
+    event is dropped and counted in `dropped`.
+    """
+
+    def __init__(self, maxsize=1024):
+        """ Initiliaze
+        """
+        self.queue = Queue(maxsize)
+        self.dropped = 0
+
+    def __call__(self, key, item, cause):
+        """ Enqueue the event without waiting
+        """
+        try:
+            self.queue.put_nowait((key, item, cause))
+        except Full:
+            self.dropped += 1
+
+    def get(self, timeout=None):
+        """ Wait for the next (key, item, cause) event
+        """
+        return self.queue.get(timeout=timeout)
+
+    def drain(self):
+        """ Return every queued event without waiting
+        """
+        events = []
+        while True:
+            try:
+                events.append(self.queue.get_nowait())
+            except Empty:
+                return events
@@ -0,0 +1,202 @@
+#!/usr/bin/python3
+""" CacheNode module
+
+An asyncio TCP server exposing one cache over the cache_protocol frames.
+
+    ./cache_node.py --port 11311 --policy LRUCache --capacity 100000
+"""
+import argparse
+import asyncio
+import json
+
+from cache_protocol import (DELETE, ERROR, GET, MAX_FRAME, NOT_FOUND, OK, PUT,
+                            REQUEST, STATS, response)
+
+POLICIES = {
+    "BasicCache": "0-basic_cache",
+    "FIFOCache": "1-fifo_cache",
+    "LIFOCache": "2-lifo_cache",
+    "LRUCache": "3-lru_cache",
+    "MRUCache": "4-mru_cache",
+    "LFUCache": "100-lfu_cache",
+    "ARCCache": "101-arc_cache",
+    "TwoQueueCache": "102-two_queue_cache",
+    "TinyLFUCache": "103-tinylfu_cache",
+}
+HIGH_WATER = 1 << 20
+
+
+def policy_class(name):
+    """ The cache class called `name` in POLICIES
+    """
+    return getattr(__import__(POLICIES[name]), name)
+
+
+class NodeProtocol(asyncio.Protocol):
+    """ One client connection
+
+    Every complete frame in the received data is executed and all their
+    responses are sent back in a single write, so pipelined requests are
+    answered in batches. Reading pauses while the client does not read
+    its responses. A frame larger than MAX_FRAME closes the connection,
+    so a bad header cannot make the node buffer without bound.
+    """
+
+    def __init__(self, node):
+        """ Initiliaze
+        """
+        self.node = node
+        self.transport = None
+        self.buffer = bytearray()
+
+    def connection_made(self, transport):
+        """ Keep the transport
+        """
+        self.transport = transport
+        transport.set_write_buffer_limits(HIGH_WATER)
+        self.node.connections.add(transport)
+
+    def connection_lost(self, exc):
+        """ Forget the transport
+        """
+        self.node.connections.discard(self.transport)
+
+    def data_received(self, data):
+        """ Execute the complete frames received so far
+        """
+        buffer = self.buffer
+        buffer += data
+        replies = []
+        offset = 0
+        size = REQUEST.size
+        while len(buffer) - offset >= size:
+            opcode, _, key_length, value_length, ttl_ms = \
+                REQUEST.unpack_from(buffer, offset)
+            if size + key_length + value_length > MAX_FRAME:
+                self.transport.write(b"".join(replies))
+                self.transport.close()
+                del buffer[:]
+                return
+            end = offset + size + key_length + value_length
+            if len(buffer) < end:
+                break
+            key = bytes(buffer[offset + size:offset + size + key_length])
+            value = bytes(buffer[end - value_length:end])
+            replies.append(self.node.execute(opcode, key, value, ttl_ms))
+            offset = end
+        del buffer[:offset]
+        if replies:
+            self.transport.write(b"".join(replies))
+
+    def pause_writing(self):
+        """ Stop reading requests until the responses are flushed
+        """
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        """ Read requests again
+        """
+        self.transport.resume_reading()
+
+
+class CacheNode():
+    """ Cache server wrapping any cache class of 0x01-caching
+
+    The cache is only used from the event loop thread, so it needs no
+    lock.
+    """
+
+    def __init__(self, cache_class=None, capacity=None, host="127.0.0.1",
+                 port=0, **kwargs):
+        """ Initiliaze
+
+        `cache_class` defaults to LRUCache; `capacity` and the other
+        keyword arguments configure it. Port 0 picks a free port, see
+        `address` once started.
+        """
+        if cache_class is None:
+            cache_class = policy_class("LRUCache")
+        self.cache = cache_class(capacity=capacity, **kwargs)
+        self.host = host
+        self.port = port
+        self.server = None
+        self.connections = set()
+        self.requests = 0
+
+    def execute(self, opcode, key, value, ttl_ms):
+        """ Run one request on the cache and encode its response
+        """
+        self.requests += 1
+        cache = self.cache
+        try:
+            if opcode == GET:
+                item = cache.get(key)
+                return response(NOT_FOUND) if item is None else \
+                    response(OK, item)
+            if opcode == PUT:
+                if ttl_ms:
+                    cache.put(key, value, ttl_ms / 1000)
+                else:
+                    cache.put(key, value)
+                return response(OK)
+            if opcode == DELETE:
+                return response(OK if cache.delete(key) else NOT_FOUND)
+            if opcode == STATS:
+                stats = dict(cache.stats(), items=len(cache.cache_data),
+                             requests=self.requests)
+                return response(OK, json.dumps(stats).encode("utf-8"))
+        except Exception as error:
+            return response(ERROR, str(error).encode("utf-8"))
+        return response(ERROR, b"unknown opcode")
+
+    async def start(self):
+        """ Start listening and return the (host, port) address
+        """
+        loop = asyncio.get_running_loop()
+        self.server = await loop.create_server(
+            lambda: NodeProtocol(self), self.host, self.port)
+        return self.address
+
+    @property
+    def address(self):
+        """ The (host, port) the node listens on
+        """
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        """ Start if needed and serve until cancelled
+        """
+        if self.server is None:
+            await self.start()
+        await self.server.serve_forever()
+
+    async def close(self):
+        """ Stop listening and close the connections
+        """
+        if self.server is not None:
+            self.server.close()
+            for transport in list(self.connections):
+                transport.close()
+            await self.server.wait_closed()
+
+
+def main():
+    """ Run a node from the command line
+    """
+    parser = argparse.ArgumentParser(description="Run a cache node.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11311)
+    parser.add_argument("--policy", choices=sorted(POLICIES),
+                        default="LRUCache")
+    parser.add_argument("--capacity", type=int, default=100000)
+    args = parser.parse_args()
+    node = CacheNode(policy_class(args.policy), args.capacity, args.host,
+                     args.port)
+    try:
+        asyncio.run(node.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+""" Cache protocol module
+
+The binary frames exchanged by cache_node and cache_client.
+
+A request is a 12-byte header, opcode, flags, key length, value length
+and TTL in milliseconds (0 for none), followed by the key and the value,
+which is at most MAX_VALUE bytes.
+A response is a 5-byte header, status and value length, followed by the
+value. Responses come back in the order of the requests, so a client
+can pipeline as many requests as it likes on one connection.
+"""
+import struct
+
+REQUEST = struct.Struct("!BBHII")
+RESPONSE = struct.Struct("!BI")
+
+GET = 1
+PUT = 2
+DELETE = 3
+STATS = 4
+
+OK = 0
+NOT_FOUND = 1
+ERROR = 2
+
+MAX_KEY = 0xFFFF
+MAX_VALUE = 1 << 26
+MAX_FRAME = REQUEST.size + MAX_KEY + MAX_VALUE
+MAX_TTL_MS = 0xFFFFFFFF
+
+
+def encode_key(key):
+    """ The bytes of a str or bytes key
+    """
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    if len(key) > MAX_KEY:
+        raise ValueError("key longer than {} bytes".format(MAX_KEY))
+    return key
+
+
+def request(opcode, key=b"", value=b"", ttl=None):
+    """ Encode a request frame; `ttl` is in seconds
+    """
+    key = encode_key(key)
+    if len(value) > MAX_VALUE:
+        raise ValueError("value longer than {} bytes".format(MAX_VALUE))
+    ttl_ms = 0 if ttl is None else max(int(ttl * 1000), 1)
+    if ttl_ms > MAX_TTL_MS:
+        raise ValueError("ttl longer than {} seconds".format(
+            MAX_TTL_MS // 1000))
+    return REQUEST.pack(opcode, 0, len(key), len(value), ttl_ms) + key + value
+
+
+def response(status, value=b""):
+    """ Encode a response frame
+    """
+    return RESPONSE.pack(status, len(value)) + value
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+""" Cache statistics module
+"""
+
+
+class LatencyHistogram():
+    """ Power-of-two histogram of durations in nanoseconds
+
+    Recording is one `bit_length` and one list increment, so it can stay
+    on the hot path; percentiles are the upper bound of their bucket.
+    """
+
+    def __init__(self):
+        """ Initiliaze
+        """
+        self.buckets = [0] * 64
+        self.count = 0
+        self.total = 0
+
+    def record(self, ns):
+        """ Add one duration
+        """
+        self.buckets[min(ns.bit_length(), 63)] += 1
+        self.count += 1
+        self.total += ns
+
+    def percentile(self, fraction):
+        """ The duration under which `fraction` of the samples fall
+        """
+        if not self.count:
+            return 0
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return 1 << bucket
+        return 1 << 63
+
+    def merge(self, other):
+        """ Add the samples of another histogram to this one
+        """
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.count += other.count
+        self.total += other.total
+
+    def as_dict(self):
+        """ Summary of the histogram
+        """
+        return {
+            "count": self.count,
+            "mean_ns": self.total / self.count if self.count else 0,
+            "p50_ns": self.percentile(0.5),
+            "p99_ns": self.percentile(0.99),
+        }
+
+
+class CacheStats():
+    """ Counters kept by every cache
+
+    Latency histograms per operation are only filled when the cache has
+    `track_latency` set.
+    """
+
+    def __init__(self):
+        """ Initiliaze
+        """
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.latency = {}
+
+    def record(self, operation, ns):
+        """ Add the duration of one `operation` call
+        """
+        histogram = self.latency.get(operation)
+        if histogram is None:
+            histogram = self.latency[operation] = LatencyHistogram()
+        histogram.record(ns)
+
+    def merge(self, other):
+        """ Add the counters of another cache to these ones
+        """
+        self.hits += other.hits
+        self.misses += other.misses
+        self.inserts += other.inserts
+        self.evictions += other.evictions
+        self.expirations += other.expirations
+        for operation, histogram in other.latency.items():
+            self.latency.setdefault(operation,
+                                    LatencyHistogram()).merge(histogram)
+
+    def as_dict(self):
+        """ Snapshot of the counters
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "inserts": self.inserts,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "latency": {operation: histogram.as_dict()
+                        for operation, histogram in self.latency.items()},
+        }
@@ -0,0 +1,687 @@
+#!/usr/bin/python3
+""" Eviction policies module
+
+Each policy only tracks keys and decides which one leaves the cache when
+it is full; the items themselves are stored by BaseCaching.
+"""
+from collections import OrderedDict
+
+
+def _item_capacity(cache):
+    """ The item capacity of `cache`, which adaptive policies require
+    """
+    if cache.capacity is None:
+        raise ValueError("this policy needs a cache with an item capacity")
+    return max(cache.capacity, 1)
+
+
+class EvictionPolicy():
+    """ EvictionPolicy defines the hooks BaseCaching calls:
+      - bind: the policy was attached to a cache
+      - admit: a new key was inserted
+      - touch: a cached key was read (touch_many: several at once)
+      - miss: a key that is not cached was read
+      - update: a cached key was written again
+      - evict: pick a victim, forget it and return it
+      - discard: forget a key removed for another reason
+      - dump, load, state, restore: save and rebuild the policy metadata
+        for BaseCaching.snapshot and BaseCaching.restore
+    """
+
+    def bind(self, cache):
+        """ Read what the policy needs to know about its cache
+        """
+
+    def admit(self, key):
+        """ Start tracking a new key
+        """
+        raise NotImplementedError("admit must be implemented in your policy")
+
+    def touch(self, key):
+        """ Record a read of a cached key
+        """
+
+    def touch_many(self, keys):
+        """ Record reads of several cached keys, in order
+        """
+        touch = self.touch
+        for key in keys:
+            touch(key)
+
+    def miss(self, key):
+        """ Record a read of a key that is not cached
+        """
+
+    def update(self, key):
+        """ Record a write to a cached key
+        """
+        self.touch(key)
+
+    def evict(self, incoming):
+        """ Choose the key to remove so that `incoming` fits, and forget it
+        """
+        raise NotImplementedError("evict must be implemented in your policy")
+
+    def discard(self, key):
+        """ Stop tracking a key that left the cache without being evicted
+        """
+        raise NotImplementedError("discard must be implemented in your policy")
+
+    def dump(self):
+        """ Picklable metadata that is not attached to a key, or None
+        """
+        return None
+
+    def load(self, meta):
+        """ Take back the metadata returned by dump
+        """
+
+    def state(self):
+        """ Yield (key, meta) pairs for every tracked key, from the one that
+        would be evicted last to the one that would be evicted first
+        """
+        raise NotImplementedError("state must be implemented in your policy")
+
+    def restore(self, key, meta):
+        """ Track a key yielded by state, as the next one to be evicted
+
+        Restoring the pairs of state in order rebuilds the eviction order
+        behind the keys that are already tracked.
+        """
+        raise NotImplementedError("restore must be implemented in your policy")
+
+
+class FIFOPolicy(EvictionPolicy):
+    """ Evicts the key that was inserted first
+    """
+
+    def __init__(self):
+        """ Initiliaze
+        """
+        self.order = OrderedDict()
+
+    def admit(self, key):
+        """ Queue the key behind the others
+        """
+        self.order[key] = None
+
+    def update(self, key):
+        """ Writing again does not change the insertion order
+        """
+
+    def evict(self, incoming):
+        """ Pop the oldest key
+        """
+        return self.order.popitem(last=False)[0]
+
+    def discard(self, key):
+        """ Forget the key
+        """
+        self.order.pop(key, None)
+
+    def state(self):
+        """ Keys from the newest to the oldest
+        """
+        for key in reversed(self.order):
+            yield key, None
+
+    def restore(self, key, meta):
+        """ Queue the key in front of the others
+        """
+        self.order[key] = None
+        self.order.move_to_end(key, last=False)
+
+
+class LIFOPolicy(FIFOPolicy):
+    """ Evicts the key that was inserted or written last
+    """
+
+    def update(self, key):
+        """ Writing again makes the key the last one in
+        """
+        self.order.move_to_end(key)
+
+    def evict(self, incoming):
+        """ Pop the newest key
+        """
+        return self.order.popitem(last=True)[0]
+
+    def state(self):
+        """ Keys from the oldest to the newest
+        """
+        for key in self.order:
+            yield key, None
+
+    def restore(self, key, meta):
+        """ Queue the key behind the others
+        """
+        self.order[key] = None
+
+
+class LRUPolicy(FIFOPolicy):
+    """ Evicts the least recently used key, in O(1)
+    """
+
+    def touch(self, key):
+        """ Mark the key as most recently used
+        """
+        self.order.move_to_end(key)
+
+    def touch_many(self, keys):
+        """ Mark the keys as most recently used, in order
+        """
+        move_to_end = self.order.move_to_end
+        for key in keys:
+            move_to_end(key)
+
+    def update(self, key):
+        """ Writing counts as a use
+        """
+        self.order.move_to_end(key)
+
+
+class MRUPolicy(FIFOPolicy):
+    """ Evicts the most recently used key
+    """
+
+    def touch(self, key):
+        """ Mark the key as most recently used
+        """
+        self.order.move_to_end(key)
+
+    def touch_many(self, keys):
+        """ Mark the keys as most recently used, in order
+        """
+        move_to_end = self.order.move_to_end
+        for key in keys:
+            move_to_end(key)
+
+    def evict(self, incoming):
+        """ Pop the most recently used key
+        """
+        return self.order.popitem(last=True)[0]
+
+    def state(self):
+        """ Keys from the least to the most recently used
+        """
+        for key in self.order:
+            yield key, None
+
+    def restore(self, key, meta):
+        """ Make the key the most recently used
+        """
+        self.order[key] = None
+
+
+class LFUPolicy(EvictionPolicy):
+    """ Evicts the least frequently used key, in O(1)
+
+    Keys are grouped in frequency buckets kept from least to most recently
+    used, and the lowest non-empty frequency is tracked, so ties evict the
+    least recently used key.
+    """
+
+    def __init__(self, decay_every=None):
+        """ Initiliaze
+
+        `decay_every`, if set, halves every frequency after that many
+        accesses so that keys which were hot long ago do not pin the cache.
+        Aging walks every key, so keep it at least as large as the capacity
+        for O(1) amortized cost.
+        """
+        self.stats = {}
+        self.buckets = {}
+        self.min_freq = 0
+        self.decay_every = decay_every
+        self.accesses = 0
+
+    def admit(self, key):
+        """ Start the key at frequency 1
+        """
+        self.stats[key] = 1
+        self.buckets.setdefault(1, OrderedDict())[key] = None
+        self.min_freq = 1
+        self._age()
+
+    def touch(self, key):
+        """ Move the key to the bucket of the next frequency
+        """
+        freq = self.stats[key]
+        self._unlink(key, freq)
+        self.stats[key] = freq + 1
+        self.buckets.setdefault(freq + 1, OrderedDict())[key] = None
+        if self.min_freq == freq and freq not in self.buckets:
+            self.min_freq = freq + 1
+        self._age()
+
+    def evict(self, incoming):
+        """ Pop the least recently used key of the lowest frequency
+
+        `min_freq` is only stale after several evictions or discards in a
+        row, without an admit in between; it is then looked up again.
+        """
+        if self.min_freq not in self.buckets:
+            self.min_freq = min(self.buckets)
+        bucket = self.buckets[self.min_freq]
+        key, _ = bucket.popitem(last=False)
+        if not bucket:
+            del self.buckets[self.min_freq]
+        del self.stats[key]
+        return key
+
+    def discard(self, key):
+        """ Forget the key
+        """
+        freq = self.stats.pop(key, None)
+        if freq is None:
+            return
+        self._unlink(key, freq)
+
+    def state(self):
+        """ Keys with their frequency, from the highest frequency down and
+        from the most recently used within a frequency
+        """
+        for freq in sorted(self.buckets, reverse=True):
+            for key in reversed(self.buckets[freq]):
+                yield key, freq
+
+    def restore(self, key, meta):
+        """ Put the key first in the bucket of its saved frequency
+        """
+        freq = meta
+        self.stats[key] = freq
+        bucket = self.buckets.setdefault(freq, OrderedDict())
+        bucket[key] = None
+        bucket.move_to_end(key, last=False)
+        if not self.min_freq or freq < self.min_freq:
+            self.min_freq = freq
+
+    def _unlink(self, key, freq):
+        """ Remove the key from its bucket, dropping the bucket once empty
+        """
+        bucket = self.buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[freq]
+
+    def _age(self):
+        """ Halve every frequency once `decay_every` accesses were made
+
+        Buckets are merged in ascending order, so among keys that end up
+        with the same frequency the ones that had the lower one go first.
+        """
+        if self.decay_every is None:
+            return
+        self.accesses += 1
+        if self.accesses < self.decay_every:
+            return
+        self.accesses = 0
+        buckets = {}
+        for freq in sorted(self.buckets):
+            aged = max(freq >> 1, 1)
+            bucket = buckets.setdefault(aged, OrderedDict())
+            for key in self.buckets[freq]:
+                bucket[key] = None
+                self.stats[key] = aged
+        self.buckets = buckets
+        self.min_freq = min(buckets) if buckets else 0
+
+
+class ARCPolicy(EvictionPolicy):
+    """ Adaptive Replacement Cache
+
+    Keys seen once live in `t1` and keys seen again in `t2`; `b1` and `b2`
+    remember the keys recently evicted from each. A miss on a ghost key
+    moves the target size `p` of `t1` towards the list that would have
+    kept it, so the policy adapts between recency and frequency and a scan
+    only churns `t1`.
+    """
+
+    def __init__(self):
+        """ Initiliaze
+        """
+        self.t1 = OrderedDict()
+        self.t2 = OrderedDict()
+        self.b1 = OrderedDict()
+        self.b2 = OrderedDict()
+        self.p = 0
+        self.c = 1
+        self.adapted = None
+
+    def bind(self, cache):
+        """ Size the lists after the capacity of the cache
+        """
+        self.c = _item_capacity(cache)
+
+    def _adapt(self, key):
+        """ Move `p` when `key` is a ghost, once per insertion
+        """
+        if self.adapted == key:
+            return
+        self.adapted = key
+        if key in self.b1:
+            delta = max(len(self.b2) / len(self.b1), 1)
+            self.p = min(self.c, self.p + delta)
+        elif key in self.b2:
+            delta = max(len(self.b1) / len(self.b2), 1)
+            self.p = max(0, self.p - delta)
+
+    def admit(self, key):
+        """ Insert a ghost hit in t2 and anything else in t1
+        """
+        self._adapt(key)
+        self.adapted = None
+        if key in self.b1:
+            del self.b1[key]
+            self.t2[key] = None
+        elif key in self.b2:
+            del self.b2[key]
+            self.t2[key] = None
+        else:
+            self.t1[key] = None
+            if len(self.t1) + len(self.b1) > self.c and self.b1:
+                self.b1.popitem(last=False)
+        ghosts = len(self.b1) + len(self.b2)
+        if len(self.t1) + len(self.t2) + ghosts > 2 * self.c and self.b2:
+            self.b2.popitem(last=False)
+
+    def touch(self, key):
+        """ A key seen again becomes the most recent entry of t2
+        """
+        if key in self.t1:
+            del self.t1[key]
+            self.t2[key] = None
+        else:
+            self.t2.move_to_end(key)
+
+    def evict(self, incoming):
+        """ Replace from t1 when it is over its target size, else from t2
+        """
+        self._adapt(incoming)
+        size = len(self.t1)
+        if self.t1 and (size > self.p or not self.t2 or
+                        (incoming in self.b2 and size == self.p)):
+            key = self.t1.popitem(last=False)[0]
+            self.b1[key] = None
+        else:
+            key = self.t2.popitem(last=False)[0]
+            self.b2[key] = None
+        return key
+
+    def discard(self, key):
+        """ Forget the key without remembering it as a ghost
+        """
+        self.t1.pop(key, None)
+        self.t2.pop(key, None)
+
+    def dump(self):
+        """ The target size of t1; the ghost lists are not kept
+        """
+        return {"p": self.p}
+
+    def load(self, meta):
+        """ Take back the target size of t1, within the capacity
+        """
+        self.p = min(meta["p"], self.c)
+
+    def state(self):
+        """ Keys of t2 then of t1, each from the most recent
+        """
+        for name in ("t2", "t1"):
+            for key in reversed(getattr(self, name)):
+                yield key, name
+
+    def restore(self, key, meta):
+        """ Put the key at the least recent end of its saved list
+        """
+        segment = getattr(self, meta)
+        segment[key] = None
+        segment.move_to_end(key, last=False)
+
+
+class TwoQueuePolicy(EvictionPolicy):
+    """ Full 2Q
+
+    New keys enter the FIFO `a1in`; keys evicted from it are remembered in
+    the ghost FIFO `a1out`, and only a key that comes back while it is a
+    ghost is admitted to the LRU `am`. A scan therefore never reaches `am`.
+    """
+
+    def __init__(self, kin=0.25, kout=0.5):
+        """ Initiliaze
+
+        `kin` and `kout` are the sizes of a1in and a1out as fractions of
+        the capacity.
+        """
+        self.kin_ratio = kin
+        self.kout_ratio = kout
+        self.kin = 1
+        self.kout = 1
+        self.a1in = OrderedDict()
+        self.a1out = OrderedDict()
+        self.am = OrderedDict()
+
+    def bind(self, cache):
+        """ Size the queues after the capacity of the cache
+        """
+        capacity = _item_capacity(cache)
+        self.kin = max(int(capacity * self.kin_ratio), 1)
+        self.kout = max(int(capacity * self.kout_ratio), 1)
+
+    def admit(self, key):
+        """ A remembered ghost goes to am, a new key to a1in
+        """
+        if key in self.a1out:
+            del self.a1out[key]
+            self.am[key] = None
+        else:
+            self.a1in[key] = None
+
+    def touch(self, key):
+        """ Hits only reorder am; a1in stays in insertion order
+        """
+        if key in self.am:
+            self.am.move_to_end(key)
+
+    def evict(self, incoming):
+        """ Drain a1in into the ghost queue while it is too large, else am
+        """
+        if self.a1in and (len(self.a1in) > self.kin or not self.am):
+            key = self.a1in.popitem(last=False)[0]
+            self.a1out[key] = None
+            if len(self.a1out) > self.kout:
+                self.a1out.popitem(last=False)
+            return key
+        return self.am.popitem(last=False)[0]
+
+    def discard(self, key):
+        """ Forget the key
+        """
+        self.a1in.pop(key, None)
+        self.am.pop(key, None)
+
+    def state(self):
+        """ Keys of am then of a1in, each from the most recent; the ghost
+        queue is not kept
+        """
+        for name in ("am", "a1in"):
+            for key in reversed(getattr(self, name)):
+                yield key, name
+
+    def restore(self, key, meta):
+        """ Put the key at the oldest end of its saved queue
+        """
+        segment = getattr(self, meta)
+        segment[key] = None
+        segment.move_to_end(key, last=False)
+
+
+class CountMinSketch():
+    """ Approximate access counts in a fixed amount of memory
+
+    Counters saturate at 15 and are all halved once `sample` increments
+    were made, so old popularity fades away.
+    """
+    SEEDS = (0x9E3779B9, 0x85EBCA6B, 0xC2B2AE35, 0x27D4EB2F)
+    HALVE = bytes(count >> 1 for count in range(256))
+
+    def __init__(self, width, sample=None):
+        """ Initiliaze with `width` counters per row, rounded up to a power
+        of two
+        """
+        width = 1 << max(width - 1, 1).bit_length()
+        self.mask = width - 1
+        self.rows = [bytearray(width) for _ in self.SEEDS]
+        self.sample = sample or 10 * width
+        self.additions = 0
+
+    def _indexes(self, key):
+        """ The counter of `key` in each row
+        """
+        h = hash(key)
+        return [((h ^ seed) * 0x9E3779B97F4A7C15 >> 17) & self.mask
+                for seed in self.SEEDS]
+
+    def increment(self, key):
+        """ Count one more access to `key`
+        """
+        for row, index in zip(self.rows, self._indexes(key)):
+            if row[index] < 15:
+                row[index] += 1
+        self.additions += 1
+        if self.additions >= self.sample:
+            self.additions //= 2
+            for row in self.rows:
+                row[:] = row.translate(self.HALVE)
+
+    def estimate(self, key):
+        """ An upper bound of the recent accesses to `key`
+        """
+        return min(row[index]
+                   for row, index in zip(self.rows, self._indexes(key)))
+
+
+class TinyLFUPolicy(EvictionPolicy):
+    """ W-TinyLFU
+
+    New keys enter a small LRU `window`. When the cache is full, the
+    window's oldest key only joins the main segmented LRU (`probation` and
+    `protected`) if a count-min sketch says it is used more often than the
+    main victim, so one-hit wonders and scans cannot flush the hot set.
+    """
+
+    def __init__(self, window=0.01, protected=0.8):
+        """ Initiliaze
+
+        `window` is the share of the capacity given to the window, and
+        `protected` the share of the main segment given to protected keys.
+        """
+        self.window_ratio = window
+        self.protected_ratio = protected
+        self.window_cap = 1
+        self.main_cap = 1
+        self.protected_cap = 1
+        self.window = OrderedDict()
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.sketch = CountMinSketch(16)
+
+    def bind(self, cache):
+        """ Size the segments and the sketch after the cache capacity
+        """
+        capacity = _item_capacity(cache)
+        self.window_cap = max(int(capacity * self.window_ratio), 1)
+        self.main_cap = max(capacity - self.window_cap, 1)
+        self.protected_cap = max(int(self.main_cap * self.protected_ratio),
+                                 1)
+        self.sketch = CountMinSketch(capacity)
+
+    def admit(self, key):
+        """ New keys always start in the window
+
+        While the main segment has room, the window's oldest key moves
+        there without having to compete.
+        """
+        self.sketch.increment(key)
+        self.window[key] = None
+        if (len(self.window) > self.window_cap and
+                len(self.probation) + len(self.protected) < self.main_cap):
+            oldest = self.window.popitem(last=False)[0]
+            self.probation[oldest] = None
+
+    def miss(self, key):
+        """ Misses count towards the popularity of a key too
+        """
+        self.sketch.increment(key)
+
+    def touch(self, key):
+        """ Record the access and promote probation keys to protected
+        """
+        self.sketch.increment(key)
+        if key in self.window:
+            self.window.move_to_end(key)
+        elif key in self.probation:
+            del self.probation[key]
+            self.protected[key] = None
+            if len(self.protected) > self.protected_cap:
+                demoted = self.protected.popitem(last=False)[0]
+                self.probation[demoted] = None
+        else:
+            self.protected.move_to_end(key)
+
+    def _main_victim(self):
+        """ The key the main segment would give up first, if any
+        """
+        for segment in (self.probation, self.protected):
+            if segment:
+                return next(iter(segment)), segment
+        return None, None
+
+    def evict(self, incoming):
+        """ Let the window's oldest key compete with the main victim
+        """
+        victim, segment = self._main_victim()
+        if victim is None:
+            return self.window.popitem(last=False)[0]
+        if len(self.window) < self.window_cap:
+            del segment[victim]
+            return victim
+        candidate = self.window.popitem(last=False)[0]
+        if self.sketch.estimate(candidate) > self.sketch.estimate(victim):
+            del segment[victim]
+            self.probation[candidate] = None
+            return victim
+        return candidate
+
+    def discard(self, key):
+        """ Forget the key
+        """
+        for segment in (self.window, self.probation, self.protected):
+            segment.pop(key, None)
+
+    def state(self):
+        """ Keys of protected, probation then the window, each from the
+        most recent
+        """
+        for name in ("protected", "probation", "window"):
+            for key in reversed(getattr(self, name)):
+                yield key, name
+
+    def restore(self, key, meta):
+        """ Put the key at the oldest end of its saved segment
+
+        A segment that is already full, because the capacity shrank or
+        keys were admitted meanwhile, sends the key to probation instead.
+        The sketch is not saved, since it hashes keys with the salted
+        hash(); restored keys are counted again, twice when protected.
+        """
+        if meta == "protected" and len(self.protected) >= self.protected_cap:
+            meta = "probation"
+        elif meta == "window" and len(self.window) >= self.window_cap:
+            meta = "probation"
+        self.sketch.increment(key)
+        if meta == "protected":
+            self.sketch.increment(key)
+        segment = getattr(self, meta)
+        segment[key] = None
+        segment.move_to_end(key, last=False)
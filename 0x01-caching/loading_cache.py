@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+""" LoadingCache module
+
+A read-through cache and a memoizing decorator on top of the eviction
+policies.
+"""
+import functools
+from threading import Event, Lock
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+
+class CachedNone():
+    """ Type of CACHED_NONE, stored in place of a None result
+    """
+
+    def __repr__(self):
+        """ Printable form
+        """
+        return "CACHED_NONE"
+
+
+CACHED_NONE = CachedNone()
+KWARGS_MARK = object()
+
+
+class Flight():
+    """ One load in progress, shared by every caller asking for its key
+    """
+
+    def __init__(self):
+        """ Initiliaze
+        """
+        self.event = Event()
+        self.value = None
+        self.error = None
+
+    def finish(self, value=None, error=None):
+        """ Publish the outcome of the load and wake the waiters
+        """
+        self.value = value
+        self.error = error
+        self.event.set()
+
+    def wait(self):
+        """ The value loaded by the leader, or its exception
+        """
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class LoadingCache():
+    """ Read-through cache calling `loader(key)` on misses
+
+    Concurrent misses on the same key run the loader once: the first
+    caller loads, the others wait for its result (single flight). None
+    results are cached too, and exceptions listed in `missing` are cached
+    as negative entries, re-raised as KeyError until they expire after
+    `negative_ttl` seconds; other exceptions are not cached.
+    """
+    NEGATIVE_TTL = 60.0
+
+    def __init__(self, loader=None, policy=LRUCache, capacity=None,
+                 ttl=None, missing=(KeyError,), negative_ttl=NEGATIVE_TTL,
+                 **kwargs):
+        """ Initiliaze
+
+        `policy` is the cache class to use and `capacity`, `ttl` and the
+        other keyword arguments configure it. Missing keys are remembered
+        for `negative_ttl` seconds, so a key that shows up later is loaded
+        eventually; None falls back to `ttl`, and never expires without
+        one.
+        """
+        self.loader = loader
+        self.cache = policy(capacity=capacity, **kwargs)
+        self.cache.default_ttl = ttl
+        self.cache.negative_ttl = negative_ttl
+        self.missing = missing
+        self.lock = Lock()
+        self.flights = {}
+        self.loads = 0
+        self.load_failures = 0
+        self.coalesced = 0
+
+    def get(self, key):
+        """ The item for `key`, loaded with `loader` on a miss
+        """
+        return self.get_or_load(key, functools.partial(self.loader, key))
+
+    def get_or_load(self, key, load):
+        """ The item for `key`, computed by calling `load()` on a miss
+        """
+        with self.lock:
+            item = self.cache.get(key)
+            if item is not None:
+                return None if item is CACHED_NONE else item
+            if self.cache.is_negative(key):
+                raise KeyError(key)
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = Flight()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return flight.wait()
+        try:
+            value = load()
+        except BaseException as error:
+            with self.lock:
+                del self.flights[key]
+                self.load_failures += 1
+                if isinstance(error, self.missing):
+                    self.cache.put_negative(key)
+            flight.finish(error=error)
+            raise
+        with self.lock:
+            del self.flights[key]
+            self.loads += 1
+            self.cache.put(key, CACHED_NONE if value is None else value)
+        flight.finish(value)
+        return value
+
+    def put(self, key, item, ttl=None):
+        """ Prime the cache with an item, None included
+        """
+        with self.lock:
+            self.cache.put(key, CACHED_NONE if item is None else item, ttl)
+
+    def stats(self):
+        """ The statistics of the cache and of the loads
+        """
+        with self.lock:
+            stats = self.cache.stats()
+            stats.update(loads=self.loads, load_failures=self.load_failures,
+                         coalesced=self.coalesced)
+        return stats
+
+
+def cached(policy=LRUCache, capacity=None, key=None, ttl=None, **kwargs):
+    """ Memoize a function in a LoadingCache
+
+    The cache key is `key(*args, **kwargs)` if given, else the positional
+    arguments followed by the sorted keyword arguments, which must all be
+    hashable.
+    The decorated function exposes the LoadingCache as `.cache` and its
+    statistics as `.cache_info()`.
+
+        @cached(policy=LRUCache, capacity=128)
+        def get_page(page, page_size):
+            ...
+    """
+    def decorator(func):
+        """ Wrap `func`
+        """
+        loading = LoadingCache(policy=policy, capacity=capacity, ttl=ttl,
+                               **kwargs)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kw):
+            """ Return the cached result, calling `func` on a miss
+            """
+            if key is not None:
+                cache_key = key(*args, **kw)
+            elif kw:
+                cache_key = args + (KWARGS_MARK,) + tuple(sorted(kw.items()))
+            else:
+                cache_key = args
+            return loading.get_or_load(
+                cache_key, functools.partial(func, *args, **kw))
+
+        wrapper.cache = loading
+        wrapper.cache_info = loading.stats
+        return wrapper
+    return decorator
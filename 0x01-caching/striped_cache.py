@@ -0,0 +1,232 @@
+#!/usr/bin/python3
+""" StripedCache module
+"""
+from threading import Lock, local
+
+from base_caching import NEGATIVE, BaseCaching
+from cache_stats import CacheStats
+from eviction_policies import EvictionPolicy
+
+
+def passive_reads(policy):
+    """ Whether reads leave `policy` untouched, so they need no lock
+    """
+    return (policy is not None and
+            type(policy).touch is EvictionPolicy.touch and
+            type(policy).miss is EvictionPolicy.miss)
+
+
+class StripedCache():
+    """ Thread-safe cache made of independently locked segments
+
+    Keys are spread over `segments` caches of `cache_class` by hash, each
+    guarded by its own lock, so threads working on different segments do
+    not wait for each other. Eviction follows the policy of `cache_class`
+    within each segment. When reads do not change the policy's state, as
+    with FIFO and LIFO, get does not take a lock at all until a TTL is
+    used, since reads may then have to expire items: it only looks the
+    key up, and counts the hit or miss in a tally of its own thread.
+    """
+
+    def __init__(self, cache_class, capacity=None, segments=16, **kwargs):
+        """ Initiliaze
+
+        `capacity` is the total number of items, split as evenly as
+        possible between the segments (MAX_ITEMS by default); there are
+        never more segments than items. Other keyword arguments are passed
+        on to `cache_class`.
+        """
+        if capacity is None:
+            capacity = BaseCaching.MAX_ITEMS
+        segments = max(min(segments, capacity), 1)
+        per_segment, extra = divmod(capacity, segments)
+        self.segments = [cache_class(capacity=max(per_segment +
+                                                  (index < extra), 1),
+                                     **kwargs)
+                         for index in range(segments)]
+        self.locks = [Lock() for _ in range(segments)]
+        self.lock_free_reads = all(
+            passive_reads(segment.policy) and segment.default_ttl is None
+            for segment in self.segments)
+        self.local = local()
+        self.tallies = []
+        self.tallies_lock = Lock()
+
+    def _timed(self, ttl):
+        """ Stop lock-free reads for good before writing with `ttl`
+
+        Lock-free reads check the flag again after looking a key up, so
+        none of them returns an item that a later TTL could have expired.
+        """
+        if ttl is not None:
+            self.lock_free_reads = False
+
+    def _tally(self):
+        """ The [hits, misses] of the lock-free reads of this thread
+        """
+        try:
+            return self.local.tally
+        except AttributeError:
+            tally = self.local.tally = [0, 0]
+            with self.tallies_lock:
+                self.tallies.append(tally)
+            return tally
+
+    def _peek(self, segment, keys):
+        """ Read `keys` from `segment` without its lock, or return None
+
+        None means a TTL came into use meanwhile and the lock is needed.
+        """
+        data = segment.cache_data
+        found = [data.get(key) for key in keys]
+        if not self.lock_free_reads:
+            return None
+        hits = sum(item is not None for item in found)
+        tally = self._tally()
+        tally[0] += hits
+        tally[1] += len(found) - hits
+        return [None if item is NEGATIVE else item for item in found]
+
+    def _segment(self, key):
+        """ The index of the segment holding `key`
+        """
+        return hash(key) % len(self.segments)
+
+    def put(self, key, item, ttl=None):
+        """ Add an item in the segment of its key
+        """
+        if key is None or item is None:
+            return
+        self._timed(ttl)
+        index = self._segment(key)
+        with self.locks[index]:
+            self.segments[index].put(key, item, ttl)
+
+    def put_negative(self, key, ttl=None):
+        """ Remember that `key` has no item, for `ttl` seconds
+        """
+        if key is None:
+            return
+        self._timed(self.segments[0].negative_ttl if ttl is None else ttl)
+        index = self._segment(key)
+        with self.locks[index]:
+            self.segments[index].put_negative(key, ttl)
+
+    def is_negative(self, key):
+        """ Whether `key` is cached as known to be missing
+        """
+        if key is None:
+            return False
+        index = self._segment(key)
+        with self.locks[index]:
+            return self.segments[index].is_negative(key)
+
+    def reap(self):
+        """ Remove every expired item, returning how many there were
+        """
+        expired = 0
+        for index, segment in enumerate(self.segments):
+            with self.locks[index]:
+                expired += segment.reap()
+        return expired
+
+    def get(self, key):
+        """ Get an item by key
+        """
+        if key is None:
+            return None
+        index = self._segment(key)
+        segment = self.segments[index]
+        if self.lock_free_reads:
+            item = segment.cache_data.get(key)
+            if self.lock_free_reads:
+                self._tally()[item is None] += 1
+                return None if item is NEGATIVE else item
+        with self.locks[index]:
+            return segment.get(key)
+
+    def put_many(self, mapping, ttl=None):
+        """ Add several items, locking each segment once
+
+        Returns the evicted keys, grouped by segment.
+        """
+        if hasattr(mapping, "items"):
+            mapping = mapping.items()
+        self._timed(ttl)
+        groups = {}
+        for key, item in mapping:
+            if key is not None and item is not None:
+                groups.setdefault(self._segment(key), []).append((key, item))
+        evicted = []
+        for index, pairs in groups.items():
+            with self.locks[index]:
+                evicted.extend(self.segments[index].put_many(pairs, ttl))
+        return evicted
+
+    def get_many(self, keys):
+        """ Get several items, locking each segment once
+
+        Returns the items in the order of `keys`, None for missing ones.
+        """
+        keys = list(keys)
+        groups = {}
+        for position, key in enumerate(keys):
+            if key is not None:
+                groups.setdefault(self._segment(key), []).append(position)
+        items = [None] * len(keys)
+        for index, positions in groups.items():
+            segment = self.segments[index]
+            wanted = [keys[position] for position in positions]
+            found = None
+            if self.lock_free_reads:
+                found = self._peek(segment, wanted)
+            if found is None:
+                with self.locks[index]:
+                    found = segment.get_many(wanted)
+            for position, item in zip(positions, found):
+                items[position] = item
+        return items
+
+    def add_listener(self, listener):
+        """ Call `listener(key, item, cause)` on evictions in any segment
+
+        The listener runs under the lock of the segment, so it must be
+        thread-safe and quick, such as a cache_events.EvictionQueue.
+        """
+        for segment in self.segments:
+            segment.add_listener(listener)
+
+    def remove_listener(self, listener):
+        """ Stop calling `listener`
+        """
+        for segment in self.segments:
+            segment.remove_listener(listener)
+
+    def stats(self):
+        """ The statistics of all the segments added together
+        """
+        total = CacheStats()
+        for index, segment in enumerate(self.segments):
+            with self.locks[index]:
+                total.merge(segment.counters)
+        with self.tallies_lock:
+            for hits, misses in self.tallies:
+                total.hits += hits
+                total.misses += misses
+        return total.as_dict()
+
+    def __len__(self):
+        """ The number of cached items
+        """
+        return sum(len(segment.cache_data) for segment in self.segments)
+
+    def print_cache(self):
+        """ Print the cache
+        """
+        print("Current cache:")
+        items = {}
+        for index, segment in enumerate(self.segments):
+            with self.locks[index]:
+                items.update(segment.cache_data)
+        for key in sorted(items.keys()):
+            print("{}: {}".format(key, items.get(key)))
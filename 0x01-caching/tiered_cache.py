@@ -0,0 +1,293 @@
+#!/usr/bin/python3
+""" TieredCache module
+
+A memory cache (L1) backed by an append-only log on disk (L2).
+"""
+import os
+import pickle
+import struct
+import tempfile
+from threading import Lock, RLock, Thread
+
+from base_caching import NEGATIVE
+from cache_events import EVICTED
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+RECORD = struct.Struct("<I")
+
+
+class DiskLog():
+    """ Append-only file of pickled items with a key -> (offset, length)
+    index kept in memory
+
+    Overwritten and removed records stay in the file as garbage. Once the
+    garbage outweighs both the live records and `min_garbage` bytes, a
+    background thread copies the live records to a new file and swaps it
+    in; writes made meanwhile are carried over when swapping.
+    The log is scratch space: it is not reopened after a restart.
+    """
+
+    def __init__(self, path=None, min_garbage=1 << 20):
+        """ Initiliaze, in a temporary file unless `path` is given
+        """
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="l2-", suffix=".log")
+            os.close(fd)
+        self.path = path
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        self.end = 0
+        self.index = {}
+        self.live = 0
+        self.min_garbage = min_garbage
+        self.lock = Lock()
+        self.compactor = None
+        self.compactions = 0
+
+    def __len__(self):
+        """ The number of stored items
+        """
+        return len(self.index)
+
+    def __contains__(self, key):
+        """ Whether `key` has an item on disk
+        """
+        return key in self.index
+
+    def garbage(self):
+        """ The bytes taken by overwritten and removed records
+        """
+        return self.end - self.live
+
+    def put(self, key, item):
+        """ Append `item` under `key`, replacing any earlier one
+
+        Raises pickle.PicklingError, TypeError or AttributeError if the item
+        cannot be pickled.
+        """
+        payload = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        record = RECORD.pack(len(payload)) + payload
+        with self.lock:
+            offset = self.end
+            os.pwrite(self.fd, record, offset)
+            self.end += len(record)
+            self._forget(key)
+            self.index[key] = (offset, len(record))
+            self.live += len(record)
+        self._maybe_compact()
+
+    def get(self, key):
+        """ The item stored under `key`, or None
+        """
+        with self.lock:
+            entry = self.index.get(key)
+            if entry is None:
+                return None
+            record = os.pread(self.fd, entry[1], entry[0])
+        return pickle.loads(record[RECORD.size:])
+
+    def pop(self, key):
+        """ Remove and return the item stored under `key`, or None
+        """
+        with self.lock:
+            entry = self.index.get(key)
+            if entry is None:
+                return None
+            record = os.pread(self.fd, entry[1], entry[0])
+            self._forget(key)
+        self._maybe_compact()
+        return pickle.loads(record[RECORD.size:])
+
+    def discard(self, key):
+        """ Remove the item stored under `key`, if any
+        """
+        with self.lock:
+            if not self._forget(key):
+                return
+        self._maybe_compact()
+
+    def _forget(self, key):
+        """ Drop `key` from the index, with the lock held
+        """
+        entry = self.index.pop(key, None)
+        if entry is None:
+            return False
+        self.live -= entry[1]
+        return True
+
+    def _maybe_compact(self):
+        """ Start a background compaction if there is enough garbage
+        """
+        with self.lock:
+            garbage = self.garbage()
+            if (self.compactor is not None or garbage < self.min_garbage
+                    or garbage < self.live):
+                return
+            self.compactor = Thread(target=self._compact, daemon=True)
+            self.compactor.start()
+
+    def compact(self):
+        """ Compact now, or wait for the running compaction
+        """
+        with self.lock:
+            compactor = self.compactor
+            if compactor is None:
+                compactor = Thread(target=self._compact, daemon=True)
+                self.compactor = compactor
+                compactor.start()
+        compactor.join()
+
+    def _compact(self):
+        """ Rewrite the live records into a new file and swap it in
+
+        The copy runs without the lock; records appended meanwhile are
+        copied under the lock at the end.
+        """
+        with self.lock:
+            snapshot = dict(self.index)
+            fd = self.fd
+        tmp_path = "{}.{}.tmp".format(self.path, os.getpid())
+        new_fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            moved = {}
+            new_end = 0
+            for key, (offset, length) in snapshot.items():
+                os.pwrite(new_fd, os.pread(fd, length, offset), new_end)
+                moved[key] = (new_end, length)
+                new_end += length
+            with self.lock:
+                index = {}
+                for key, entry in self.index.items():
+                    if snapshot.get(key) == entry:
+                        index[key] = moved[key]
+                        continue
+                    offset, length = entry
+                    os.pwrite(new_fd, os.pread(fd, length, offset), new_end)
+                    index[key] = (new_end, length)
+                    new_end += length
+                os.replace(tmp_path, self.path)
+                self.fd = new_fd
+                self.index = index
+                self.end = new_end
+                self.compactions += 1
+                os.close(fd)
+        except BaseException:
+            os.close(new_fd)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            with self.lock:
+                self.compactor = None
+
+    def close(self, remove=True):
+        """ Wait for a running compaction, close the file and remove it
+        """
+        compactor = self.compactor
+        if compactor is not None:
+            compactor.join()
+        with self.lock:
+            os.close(self.fd)
+            self.index = {}
+            if remove and os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class TieredCache():
+    """ Two-tier cache: a policy cache in memory and a DiskLog on disk
+
+    Items evicted from the L1 cache are demoted to the L2 log instead of
+    being dropped, and an L1 miss that hits L2 promotes the item back to
+    L1, which may demote another one. An item lives in one tier at a time.
+    Items written with a TTL, or with `default_ttl` set, are not demoted,
+    since the log does not track deadlines; nor are negative entries and
+    items that cannot be pickled.
+    """
+
+    def __init__(self, cache_class=LRUCache, capacity=None, path=None,
+                 min_garbage=1 << 20, **kwargs):
+        """ Initiliaze
+
+        `cache_class`, `capacity` and the other keyword arguments make the
+        L1 cache; `path` and `min_garbage` configure the L2 DiskLog.
+        """
+        self.l1 = cache_class(capacity=capacity, **kwargs)
+        self.l2 = DiskLog(path, min_garbage)
+        self.lock = RLock()
+        self.expiring = set()
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.demotions = 0
+        self.l1.add_listener(self._demote)
+
+    def _demote(self, key, item, cause):
+        """ Move an item evicted from L1 to L2
+        """
+        if key in self.expiring:
+            self.expiring.discard(key)
+            return
+        if cause != EVICTED or item is NEGATIVE:
+            return
+        try:
+            self.l2.put(key, item)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        self.demotions += 1
+
+    def put(self, key, item, ttl=None):
+        """ Add an item in L1, dropping any older copy from L2
+        """
+        if key is None or item is None:
+            return
+        with self.lock:
+            self.l2.discard(key)
+            if ttl is not None or self.l1.default_ttl is not None:
+                self.expiring.add(key)
+            else:
+                self.expiring.discard(key)
+            self.l1.put(key, item, ttl)
+
+    def get(self, key):
+        """ Get an item from L1, or else from L2, promoting it to L1
+        """
+        if key is None:
+            return None
+        with self.lock:
+            item = self.l1.get(key)
+            if item is not None or self.l1.is_negative(key):
+                return item
+            item = self.l2.pop(key)
+            if item is None:
+                self.l2_misses += 1
+                return None
+            self.l2_hits += 1
+            self.expiring.discard(key)
+            self.l1.put(key, item)
+            return item
+
+    def stats(self):
+        """ The statistics of L1, and the hits, misses and size of L2
+        """
+        with self.lock:
+            stats = self.l1.stats()
+            stats.update(l2_hits=self.l2_hits, l2_misses=self.l2_misses,
+                         demotions=self.demotions, l2_items=len(self.l2),
+                         l2_bytes=self.l2.end,
+                         l2_compactions=self.l2.compactions)
+        return stats
+
+    def __len__(self):
+        """ The number of items in both tiers
+        """
+        return len(self.l1.cache_data) + len(self.l2)
+
+    def print_cache(self):
+        """ Print the L1 cache
+        """
+        self.l1.print_cache()
+
+    def close(self):
+        """ Close and remove the L2 log
+        """
+        with self.lock:
+            self.l2.close()
@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+""" TimerWheel module
+"""
+import math
+
+
+class TimerWheel():
+    """ Hierarchical timer wheel tracking when keys expire
+
+    Deadlines are rounded up to `tick` seconds. The first level has one
+    slot per tick, and each further level has slots spanning a whole turn
+    of the level below; when a lower level wraps around, the next slot of
+    the level above is cascaded down. Scheduling is O(1), and an entry is
+    moved at most once per level before it expires, so reaping costs O(1)
+    amortized per entry instead of scanning every key.
+
+    Rescheduling or cancelling a key leaves its old slot entry behind; it
+    is recognised as stale and dropped when its slot comes up.
+    """
+    BITS = (8, 6, 6, 6)
+
+    def __init__(self, tick=1.0, now=0.0):
+        """ Initiliaze the wheel at time `now`
+        """
+        self.tick = tick
+        self.current = math.floor(now / tick)
+        self.deadlines = {}
+        self.expires = {}
+        self.levels = [[[] for _ in range(1 << bits)] for bits in self.BITS]
+        self.shifts = []
+        shift = 0
+        for bits in self.BITS:
+            self.shifts.append(shift)
+            shift += bits
+        self.horizon = 1 << shift
+
+    def _ticks(self, when):
+        """ The tick at which something due at `when` can be reaped
+        """
+        return math.ceil(when / self.tick)
+
+    def __len__(self):
+        """ The number of scheduled keys
+        """
+        return len(self.deadlines)
+
+    def __contains__(self, key):
+        """ Whether `key` has a deadline
+        """
+        return key in self.deadlines
+
+    def deadline(self, key):
+        """ When `key` expires, or None
+        """
+        return self.deadlines.get(key)
+
+    def schedule(self, key, when):
+        """ Make `key` expire at time `when`, replacing any earlier deadline
+        """
+        expires = max(self._ticks(when), self.current + 1)
+        self.deadlines[key] = when
+        self.expires[key] = expires
+        self._place(key, expires)
+
+    def cancel(self, key):
+        """ Forget the deadline of `key`
+        """
+        if self.deadlines.pop(key, None) is not None:
+            del self.expires[key]
+
+    def _place(self, key, expires):
+        """ Put an entry in the slot of the lowest level that can hold it
+
+        Deadlines beyond the last level are parked in its farthest slot and
+        placed again when that slot is cascaded.
+        """
+        target = min(expires, self.current + self.horizon - 1)
+        delta = target - self.current
+        last = len(self.BITS) - 1
+        for level, bits in enumerate(self.BITS):
+            shift = self.shifts[level]
+            if delta < 1 << (shift + bits) or level == last:
+                slot = (target >> shift) & ((1 << bits) - 1)
+                self.levels[level][slot].append((key, expires))
+                return
+
+    def _cascade(self, level):
+        """ Move the current slot of `level` down, returning its index
+        """
+        bits = self.BITS[level]
+        index = (self.current >> self.shifts[level]) & ((1 << bits) - 1)
+        entries = self.levels[level][index]
+        self.levels[level][index] = []
+        for key, expires in entries:
+            if self.expires.get(key) == expires:
+                self._place(key, expires)
+        return index
+
+    def _next_event(self, limit):
+        """ The first tick after `current` with work to do, at most `limit`
+
+        That is the next non-empty slot of the first level, or the next
+        boundary at which a non-empty slot of a higher level is cascaded.
+        Only the slots before the best tick found so far are looked at, so
+        this costs a bounded number of slot checks however long the wheel
+        sat idle.
+        """
+        best = limit
+        current = self.current
+        first = self.levels[0]
+        mask = len(first) - 1
+        for tick in range(current + 1, min(current + len(first), best) + 1):
+            if first[tick & mask]:
+                best = tick
+                break
+        for level in range(1, len(self.BITS)):
+            shift = self.shifts[level]
+            slots = self.levels[level]
+            mask = len(slots) - 1
+            turn = (current >> shift) + 1
+            if turn << shift >= best:
+                break
+            for turn in range(turn, turn + len(slots)):
+                if turn << shift >= best:
+                    break
+                if slots[turn & mask]:
+                    best = turn << shift
+                    break
+        return best
+
+    def advance(self, now):
+        """ Move the wheel to time `now` and return the keys that expired
+
+        Ticks where nothing is due or cascaded are skipped in one step.
+        """
+        target = math.floor(now / self.tick)
+        expired = []
+        first = self.levels[0]
+        mask = len(first) - 1
+        while self.current < target:
+            if not self.deadlines:
+                self.current = target
+                break
+            self.current = self._next_event(target)
+            index = self.current & mask
+            if index == 0:
+                for level in range(1, len(self.BITS)):
+                    if self._cascade(level) != 0:
+                        break
+            entries = first[index]
+            if not entries:
+                continue
+            first[index] = []
+            for key, expires in entries:
+                if self.expires.get(key) != expires:
+                    continue
+                if expires <= self.current:
+                    del self.expires[key]
+                    del self.deadlines[key]
+                    expired.append(key)
+                else:
+                    self._place(key, expires)
+        return expired
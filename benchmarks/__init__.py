@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""Benchmarks for the pagination and caching projects.
+
+The project directories are not packages (their modules start with a
+digit), so benchmarks load them through ``load_task``. Run a benchmark
+from the repository root, e.g. ``python3 -m benchmarks.lru_latency``;
+``python3 -m benchmarks.run`` runs the caching and pagination suites and
+reports their results as JSON.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHING_DIR = os.path.join(ROOT, "0x01-caching")
+PAGINATION_DIR = os.path.join(ROOT, "0x00-pagination")
+
+
+def load_task(directory: str, module: str):
+    """Import a task module such as ``3-lru_cache`` from a project directory.
+
+    Args:
+        directory (str): The project directory holding the module.
+        module (str): The module name, without the ``.py`` suffix.
+
+    Returns:
+        module: The imported module.
+    """
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    return __import__(module)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Trace replay of every cache class on every synthetic workload.
+
+Each trace is replayed read-through: ``get`` every key and ``put`` it on
+a miss, so the latencies mix hits, inserts and evictions in the
+proportions the workload produces. Results are printed as JSON, with
+``bounded`` false for ``BasicCache``, which never evicts and is only
+there as a baseline.
+
+    python3 -m benchmarks.cache_suite [--capacity N] [--length N]
+                                      [--trace FILE]
+"""
+import argparse
+import json
+
+from benchmarks import CACHING_DIR, load_task
+from benchmarks.harness import measure
+from benchmarks.workloads import WORKLOADS, read_trace
+
+CACHES = (
+    ("0-basic_cache", "BasicCache"),
+    ("1-fifo_cache", "FIFOCache"),
+    ("2-lifo_cache", "LIFOCache"),
+    ("3-lru_cache", "LRUCache"),
+    ("4-mru_cache", "MRUCache"),
+    ("100-lfu_cache", "LFUCache"),
+    ("101-arc_cache", "ARCCache"),
+    ("102-two_queue_cache", "TwoQueueCache"),
+    ("103-tinylfu_cache", "TinyLFUCache"),
+)
+
+UNBOUNDED = frozenset({"BasicCache"})
+
+
+def cache_classes(bounded: bool = False) -> list:
+    """Return the ``(name, class)`` of every cache, in task order.
+
+    Args:
+        bounded (bool): Whether to leave out the caches that ignore their
+            capacity and never evict, whose hit rate is only a ceiling.
+    """
+    return [(name, getattr(load_task(CACHING_DIR, module), name))
+            for module, name in CACHES
+            if not (bounded and name in UNBOUNDED)]
+
+
+def read_through(cache, key) -> None:
+    """Get ``key`` and put it on a miss."""
+    if cache.get(key) is None:
+        cache.put(key, True)
+
+
+def replay(cache_class, capacity: int, trace, memory: bool = True) -> dict:
+    """Replay ``trace`` on a new cache and return its measurements.
+
+    Args:
+        cache_class (type): The cache to build.
+        capacity (int): Its capacity.
+        trace (Sequence): The keys in access order.
+        memory (bool): Whether to measure the peak memory.
+
+    Returns:
+        dict: The ops/sec, latencies, peak memory and hit rate.
+    """
+    result, cache = measure(lambda: cache_class(capacity=capacity),
+                            read_through, trace, memory)
+    stats = cache.stats()
+    lookups = stats["hits"] + stats["misses"]
+    result["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return result
+
+
+def run(capacity: int = 1000, length: int = 100000, keys: int = 10000,
+        trace_path: str = None, memory: bool = True) -> list:
+    """Benchmark every cache on every workload, or on one trace file.
+
+    Returns:
+        list: One result per cache and workload.
+    """
+    if trace_path:
+        traces = {trace_path: read_trace(trace_path)}
+    else:
+        traces = {name: workload(length, keys)
+                  for name, workload in WORKLOADS.items()}
+    results = []
+    for workload, trace in traces.items():
+        for name, cache_class in cache_classes():
+            result = replay(cache_class, capacity, trace, memory)
+            result.update(cache=name, workload=workload, capacity=capacity,
+                          bounded=name not in UNBOUNDED)
+            results.append(result)
+    return results
+
+
+def main() -> None:
+    """Print the results of the suite as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--capacity", type=int, default=1000)
+    parser.add_argument("--length", type=int, default=100000)
+    parser.add_argument("--keys", type=int, default=10000)
+    parser.add_argument("--trace", help="replay this file, one key per line")
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="skip the traced run measuring peak memory")
+    args = parser.parse_args()
+    print(json.dumps(run(args.capacity, args.length, args.keys, args.trace,
+                         args.memory), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Memory held by the pagination dataset, row lists versus columns.
+
+The CSV file is loaded once as the servers do by default, a list of
+lists of strings, and once as a ``ColumnarDataset``. ``tracemalloc``
+reports what each representation keeps allocated after loading, and the
+peak reached while loading. Serving a page from each is timed too, since
+the columnar rows are rebuilt on every request.
+"""
+import csv
+import os
+import time
+import tracemalloc
+
+from benchmarks import PAGINATION_DIR, load_task
+
+DATA_FILE = os.path.join(PAGINATION_DIR, "Popular_Baby_Names.csv")
+PAGES = 10000
+PAGE_SIZE = 10
+
+
+def list_of_lists(path: str) -> list:
+    """Load the rows the way the servers do without a loader."""
+    with open(path) as f:
+        reader = csv.reader(f)
+        dataset = [row for row in reader]
+    return dataset[1:]
+
+
+def measure(name: str, load) -> dict:
+    """Load the dataset with ``load`` and report its memory and page time.
+
+    Args:
+        name (str): The label of the representation.
+        load (Callable[[str], Sequence[List]]): The dataset loader.
+
+    Returns:
+        dict: The retained and peak bytes, and the nanoseconds per page.
+    """
+    tracemalloc.start()
+    dataset = load(DATA_FILE)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    last = len(dataset) - PAGE_SIZE
+    start = time.perf_counter_ns()
+    for page in range(PAGES):
+        first = page * PAGE_SIZE % last
+        dataset[first:first + PAGE_SIZE]
+    return {
+        "name": name,
+        "rows": len(dataset),
+        "retained": retained,
+        "peak": peak,
+        "page_ns": (time.perf_counter_ns() - start) / PAGES,
+    }
+
+
+def main() -> None:
+    """Print the memory and page time of each representation."""
+    columnar = load_task(PAGINATION_DIR, "columnar_dataset").ColumnarDataset
+    rows = [measure("list of lists", list_of_lists),
+            measure("columnar", columnar)]
+    print("{:<14} {:>7} {:>12} {:>12} {:>8}".format(
+        "dataset", "rows", "retained_kb", "peak_kb", "page_ns"))
+    for row in rows:
+        print("{:<14} {:>7} {:>12.0f} {:>12.0f} {:>8.0f}".format(
+            row["name"], row["rows"], row["retained"] / 1024,
+            row["peak"] / 1024, row["page_ns"]))
+    print("retained memory reduced {:.1f}x".format(
+        rows[0]["retained"] / rows[1]["retained"]))
+
+
+if __name__ == "__main__":
+    main()
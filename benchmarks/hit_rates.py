@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Trace-driven hit rates of every eviction policy.
+
+Each key of the trace is read with ``get`` and written with ``put`` on a
+miss, the way a read-through caller uses the caches. Pass a trace file
+with one key per line, or let the benchmark generate one that mixes a
+Zipf-distributed hot set with long sequential scans, such as bulk paging
+through the baby-names dataset.
+
+    python3 -m benchmarks.hit_rates [--capacity N] [TRACE]
+"""
+import argparse
+
+from benchmarks.cache_suite import cache_classes
+from benchmarks.workloads import read_trace, scan_mix_trace
+
+
+def hit_rate(cache, trace) -> float:
+    """Replay ``trace`` against ``cache`` and return the share of hits."""
+    hits = 0
+    for key in trace:
+        if cache.get(key) is None:
+            cache.put(key, True)
+        else:
+            hits += 1
+    return hits / len(trace)
+
+
+def main() -> None:
+    """Print the hit rate of every evicting cache class on the trace."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace", nargs="?", help="one key per line")
+    parser.add_argument("--capacity", type=int, default=1000)
+    args = parser.parse_args()
+    trace = read_trace(args.trace) if args.trace else scan_mix_trace()
+    print("{:<14} {:>8}".format("cache", "hit rate"))
+    for name, cache_class in cache_classes(bounded=True):
+        cache = cache_class(args.capacity)
+        print("{:<14} {:>8.2%}".format(name, hit_rate(cache, trace)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Per-operation latency of LRUCache from 4 to 1M entries.
+
+Each capacity is filled to the brim, then ``get`` hits, ``put`` updates
+and ``put`` calls that evict are timed separately. With O(1) operations
+the nanoseconds per call do not grow with the capacity; the step seen
+past a few hundred thousand entries comes from CPU cache misses on
+random keys, not from extra work per call.
+"""
+import random
+import time
+
+from benchmarks import CACHING_DIR, load_task
+
+CAPACITIES = (4, 64, 1024, 16384, 262144, 1048576)
+OPS = 100000
+
+
+def per_op(func, keys) -> float:
+    """Return the mean nanoseconds of ``func(key)`` over ``keys``."""
+    start = time.perf_counter_ns()
+    for key in keys:
+        func(key)
+    return (time.perf_counter_ns() - start) / len(keys)
+
+
+def measure(capacity: int) -> dict:
+    """Time get, update and evicting put on a full cache of ``capacity``.
+
+    Args:
+        capacity (int): The number of entries the cache holds.
+
+    Returns:
+        dict: The nanoseconds per operation for each kind of call.
+    """
+    cache = load_task(CACHING_DIR, "3-lru_cache").LRUCache(capacity)
+    for key in range(1, capacity + 1):
+        cache.put(key, key)
+    rng = random.Random(capacity)
+    hits = [rng.randint(1, capacity) for _ in range(OPS)]
+    fresh = range(capacity + 1, capacity + 1 + OPS)
+    return {
+        "capacity": capacity,
+        "get_ns": per_op(cache.get, hits),
+        "update_ns": per_op(lambda key: cache.put(key, key), hits),
+        "evict_ns": per_op(lambda key: cache.put(key, key), fresh),
+    }
+
+
+def main() -> None:
+    """Print one line of per-operation latencies per capacity."""
+    print("{:>9} {:>8} {:>10} {:>9}".format(
+        "capacity", "get_ns", "update_ns", "evict_ns"))
+    for capacity in CAPACITIES:
+        row = measure(capacity)
+        print("{capacity:>9} {get_ns:>8.0f} {update_ns:>10.0f} "
+              "{evict_ns:>9.0f}".format(**row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Cold start and page latencies of the three pagination servers.
+
+The baby-names CSV is scaled up synthetically by repeating its rows
+until the wanted size, and every ``Server`` variant is pointed at the
+scaled copy. For each size the suite measures:
+
+- ``cold_start``: the first ``dataset()`` call (and the index of the
+  deletion-resilient server), with its peak memory;
+- ``get_page``, ``get_hyper`` and ``get_hyper_encoded``: random pages
+  across the dataset, the latter encoded to JSON bytes;
+- ``get_hyper_index``: pages starting in the last tenth of the dataset
+  after 1% of the rows were deleted.
+
+Results are printed as JSON.
+
+    python3 -m benchmarks.pagination_suite [--sizes N ...] [--loader NAME]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+
+from benchmarks import PAGINATION_DIR, load_task
+from benchmarks.harness import measure
+
+DATA_FILE = os.path.join(PAGINATION_DIR, "Popular_Baby_Names.csv")
+SERVERS = (
+    ("1-simple_pagination", "simple"),
+    ("2-hypermedia_pagination", "hypermedia"),
+    ("3-hypermedia_del_pagination", "deletion_resilient"),
+)
+LOADERS = {
+    "csv": None,
+    "mapped": ("mapped_dataset", "MappedDataset"),
+    "columnar": ("columnar_dataset", "ColumnarDataset"),
+    "snapshot": ("snapshot_dataset", "SnapshotDataset"),
+    "parallel": ("parallel_ingest", "ingest"),
+    "streaming": ("parallel_ingest", "StreamingDataset"),
+}
+REQUESTS = 2000
+PAGE_SIZE = 10
+
+
+def scale_csv(rows: int, directory: str) -> str:
+    """Write a copy of the CSV file with ``rows`` rows.
+
+    Args:
+        rows (int): The number of rows, header excluded.
+        directory (str): Where to write the copy.
+
+    Returns:
+        str: The path of the copy.
+    """
+    with open(DATA_FILE) as f:
+        header = f.readline()
+        lines = f.readlines()
+    path = os.path.join(directory, "Popular_Baby_Names_{}.csv".format(rows))
+    with open(path, "w") as f:
+        f.write(header)
+        for _ in range(rows // len(lines)):
+            f.writelines(lines)
+        f.writelines(lines[:rows % len(lines)])
+    return path
+
+
+def loader_for(name: str):
+    """Return the dataset loader called ``name`` in ``LOADERS``."""
+    if LOADERS[name] is None:
+        return None
+    module, attribute = LOADERS[name]
+    return getattr(load_task(PAGINATION_DIR, module), attribute)
+
+
+def server_class(module: str, path: str) -> type:
+    """Return the ``Server`` of ``module`` reading ``path``."""
+    server = load_task(PAGINATION_DIR, module).Server
+    return type("Scaled" + server.__name__, (server,), {"DATA_FILE": path})
+
+
+def cold_start(server) -> None:
+    """Load the dataset, and the deletion-resilient index if there is one."""
+    server.dataset()
+    if hasattr(server, "indexed_dataset"):
+        server.indexed_dataset()
+
+
+def bench_server(module: str, variant: str, path: str, rows: int,
+                 loader) -> list:
+    """Measure one server variant on one scaled dataset.
+
+    Returns:
+        list: One result per measured call.
+    """
+    cls = server_class(module, path)
+    rng = random.Random(rows)
+    pages = [rng.randint(1, rows // PAGE_SIZE) for _ in range(REQUESTS)]
+    results = []
+    result, server = measure(lambda: cls(loader=loader),
+                             lambda server, _: cold_start(server), [None])
+    results.append(dict(result, call="cold_start"))
+    result, _ = measure(lambda: server,
+                        lambda server, page: server.get_page(page, PAGE_SIZE),
+                        pages, memory=False)
+    results.append(dict(result, call="get_page"))
+    if hasattr(server, "get_hyper"):
+        result, _ = measure(
+            lambda: server,
+            lambda server, page: server.get_hyper(page, PAGE_SIZE),
+            pages, memory=False)
+        results.append(dict(result, call="get_hyper"))
+        result, _ = measure(
+            lambda: server,
+            lambda server, page: server.get_hyper_encoded(page, PAGE_SIZE),
+            pages, memory=False)
+        results.append(dict(result, call="get_hyper_encoded"))
+    if hasattr(server, "get_hyper_index"):
+        indexed = server.indexed_dataset()
+        for index in rng.sample(range(rows), rows // 100):
+            del indexed[index]
+        last = indexed.max_index()
+        starts = [rng.randint(last - last // 10, last)
+                  for _ in range(REQUESTS)]
+        result, _ = measure(
+            lambda: server,
+            lambda server, index: server.get_hyper_index(index, PAGE_SIZE),
+            starts, memory=False)
+        results.append(dict(result, call="get_hyper_index"))
+    for result in results:
+        result.update(server=variant, rows=rows)
+    return results
+
+
+def run(sizes=(100000, 1000000), loader: str = "csv") -> list:
+    """Benchmark every server variant on every dataset size.
+
+    Returns:
+        list: One result per server, size and call.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            path = scale_csv(rows, directory)
+            for module, variant in SERVERS:
+                for result in bench_server(module, variant, path, rows,
+                                           loader_for(loader)):
+                    result["loader"] = loader
+                    results.append(result)
+    return results
+
+
+def main() -> None:
+    """Print the results of the suite as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[100000, 1000000])
+    parser.add_argument("--loader", choices=sorted(LOADERS), default="csv")
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes, args.loader), indent=2))
+
+
+if __name__ == "__main__":
+    main()
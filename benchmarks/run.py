@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Run the benchmark suites and save or compare their JSON results.
+
+    python3 -m benchmarks.run [--suite caching|pagination|all]
+                              [--output FILE] [--compare BASELINE]
+
+With ``--compare``, every result is matched with the baseline entry of
+the same suite and parameters, and the ratio of its ops/sec and p99
+latency is printed; ratios beyond ``--tolerance`` are flagged.
+"""
+import argparse
+import json
+import platform
+import sys
+
+from benchmarks import cache_suite, pagination_suite
+
+KEYS = {
+    "caching": ("cache", "workload", "capacity"),
+    "pagination": ("server", "rows", "call", "loader"),
+}
+
+
+def collect(suite: str, quick: bool) -> dict:
+    """Run the selected suites and return their results with metadata.
+
+    Args:
+        suite (str): ``caching``, ``pagination`` or ``all``.
+        quick (bool): Whether to use smaller workloads and datasets.
+
+    Returns:
+        dict: The environment and one list of results per suite.
+    """
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "quick": quick,
+        },
+    }
+    if suite in ("caching", "all"):
+        length = 20000 if quick else 100000
+        report["caching"] = cache_suite.run(length=length)
+    if suite in ("pagination", "all"):
+        sizes = (100000,) if quick else (100000, 1000000)
+        report["pagination"] = pagination_suite.run(sizes)
+    return report
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> int:
+    """Print how each result moved against the baseline.
+
+    Args:
+        report (dict): The new results.
+        baseline (dict): The results to compare with.
+        tolerance (float): The relative change reported as a regression.
+
+    Returns:
+        int: The number of regressions.
+    """
+    regressions = 0
+    for suite, fields in KEYS.items():
+        old = {tuple(result[field] for field in fields): result
+               for result in baseline.get(suite, [])}
+        for result in report.get(suite, []):
+            key = tuple(result[field] for field in fields)
+            before = old.get(key)
+            if before is None:
+                continue
+            speed = result["ops_per_sec"] / before["ops_per_sec"]
+            p99 = result["p99_ns"] / max(before["p99_ns"], 1)
+            slower = speed < 1 - tolerance or p99 > 1 + tolerance
+            regressions += slower
+            print("{:<10} {:<40} ops/sec x{:.2f}  p99 x{:.2f}{}".format(
+                suite, " ".join(str(part) for part in key), speed, p99,
+                "  REGRESSION" if slower else ""))
+    return regressions
+
+
+def main() -> None:
+    """Run the suites, then save and compare the report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", choices=("caching", "pagination", "all"),
+                        default="all")
+    parser.add_argument("--quick", action="store_true",
+                        help="smaller workloads and datasets")
+    parser.add_argument("--output", help="write the report to this file")
+    parser.add_argument("--compare", help="a report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+    report = collect(args.suite, args.quick)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
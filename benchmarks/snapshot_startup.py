@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Cold start of a pagination server, CSV parsing versus binary snapshot.
+
+Every run is a fresh interpreter that builds a hypermedia ``Server``
+with the given loader and serves its first ``get_hyper`` page. The time
+covers that first request only, not the interpreter start-up, and the
+RSS growth is the peak resident size of the process minus the size it
+had before the first request. The snapshot is compiled once beforehand,
+as a deployment would, and the files are in the page cache for every
+mode.
+"""
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks import PAGINATION_DIR, load_task
+
+LOADERS = {
+    "csv": None,
+    "mapped": ("mapped_dataset", "MappedDataset"),
+    "snapshot": ("snapshot_dataset", "SnapshotDataset"),
+}
+RUNS = 5
+
+
+def rss_kb() -> int:
+    """Return the resident size of this process, in kilobytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def child(mode: str) -> None:
+    """Serve the first page in this process and print its cost as JSON."""
+    os.chdir(PAGINATION_DIR)
+    server_class = load_task(PAGINATION_DIR, "2-hypermedia_pagination").Server
+    loader = None
+    if LOADERS[mode] is not None:
+        module, name = LOADERS[mode]
+        loader = getattr(load_task(PAGINATION_DIR, module), name)
+    before = rss_kb()
+    start = time.perf_counter()
+    server_class(loader=loader).get_hyper(1, 10)
+    elapsed = time.perf_counter() - start
+    after = rss_kb()
+    print(json.dumps({"ms": elapsed * 1000, "rss_kb": after - before}))
+
+
+def measure(mode: str) -> dict:
+    """Run ``RUNS`` fresh processes for ``mode`` and keep the medians."""
+    runs = []
+    for _ in range(RUNS):
+        output = subprocess.check_output(
+            [sys.executable, "-m", "benchmarks.snapshot_startup", mode],
+            cwd=os.path.dirname(PAGINATION_DIR))
+        runs.append(json.loads(output))
+    return {
+        "mode": mode,
+        "ms": statistics.median(run["ms"] for run in runs),
+        "rss_kb": statistics.median(run["rss_kb"] for run in runs),
+    }
+
+
+def main() -> None:
+    """Print the first-request time and RSS growth of each loader."""
+    snapshot = load_task(PAGINATION_DIR, "snapshot_dataset")
+    snapshot.build(os.path.join(PAGINATION_DIR, "Popular_Baby_Names.csv"))
+    mapped = load_task(PAGINATION_DIR, "mapped_dataset")
+    mapped.MappedDataset(
+        os.path.join(PAGINATION_DIR, "Popular_Baby_Names.csv")).close()
+    print("{:<9} {:>9} {:>8}".format("loader", "first_ms", "rss_kb"))
+    for mode in LOADERS:
+        row = measure(mode)
+        print("{mode:<9} {ms:>9.2f} {rss_kb:>8.0f}".format(**row))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        child(sys.argv[1])
+    else:
+        main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Multi-threaded throughput of StripedCache against a single lock.
+
+Every thread runs the same read-mostly mix (90% get, 10% put) on a
+cache, first guarded by one global lock, then striped over segments. On
+a GIL build the striped cache mostly saves lock hand-offs, and lock-free
+reads pay off for FIFO; on a free-threaded build the segments run in
+parallel.
+
+    python3 -m benchmarks.striped_throughput
+"""
+import random
+import threading
+import time
+
+from benchmarks import CACHING_DIR, load_task
+
+THREADS = (1, 2, 4, 8, 16)
+OPS_PER_THREAD = 50000
+CAPACITY = 10000
+KEYS = 20000
+
+
+class LockedCache():
+    """A cache behind one global lock, the baseline to beat."""
+
+    def __init__(self, cache):
+        """Wrap ``cache`` with a lock."""
+        self.cache = cache
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Get under the global lock."""
+        with self.lock:
+            return self.cache.get(key)
+
+    def put(self, key, item):
+        """Put under the global lock."""
+        with self.lock:
+            self.cache.put(key, item)
+
+
+def worker(cache, seed: int) -> None:
+    """Run the read-mostly mix against ``cache``."""
+    rng = random.Random(seed)
+    keys = [rng.randrange(KEYS) for _ in range(OPS_PER_THREAD)]
+    writes = [rng.random() < 0.1 for _ in range(OPS_PER_THREAD)]
+    for key, write in zip(keys, writes):
+        if write:
+            cache.put(key, key)
+        else:
+            cache.get(key)
+
+
+def throughput(cache, threads: int) -> float:
+    """Return the operations per second of ``threads`` workers."""
+    pool = [threading.Thread(target=worker, args=(cache, seed))
+            for seed in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return threads * OPS_PER_THREAD / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Print ops/sec per thread count for both designs and two policies."""
+    striped = load_task(CACHING_DIR, "striped_cache").StripedCache
+    print("{:<10} {:>7} {:>12} {:>12}".format(
+        "cache", "threads", "global_lock", "striped"))
+    for module, name in (("3-lru_cache", "LRUCache"),
+                         ("1-fifo_cache", "FIFOCache")):
+        cache_class = getattr(load_task(CACHING_DIR, module), name)
+        for threads in THREADS:
+            locked = throughput(
+                LockedCache(cache_class(capacity=CAPACITY)), threads)
+            sharded = throughput(
+                striped(cache_class, capacity=CAPACITY), threads)
+            print("{:<10} {:>7} {:>12.0f} {:>12.0f}".format(
+                name, threads, locked, sharded))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Synthetic key traces for the cache benchmarks.
+
+Every generator is seeded, so a trace, and the hit rates measured on it,
+are the same from one run to the next.
+"""
+import itertools
+import random
+from typing import Callable, Dict, List
+
+
+def zipf_trace(length: int = 100000, keys: int = 10000, skew: float = 1.0,
+               seed: int = 0) -> List[int]:
+    """Draw keys with Zipf-distributed popularity.
+
+    Args:
+        length (int): The number of accesses.
+        keys (int): The number of distinct keys.
+        skew (float): The Zipf exponent; key ``k`` has weight
+            ``1 / (k + 1) ** skew``.
+        seed (int): The random seed.
+
+    Returns:
+        List[int]: The keys in access order.
+    """
+    rng = random.Random(seed)
+    weights = list(itertools.accumulate(1 / rank ** skew for rank in
+                                        range(1, keys + 1)))
+    return rng.choices(range(keys), cum_weights=weights, k=length)
+
+
+def scan_trace(length: int = 100000, keys: int = 10000,
+               seed: int = 0) -> List[int]:
+    """Read ``keys`` distinct keys in order, again and again.
+
+    A scan longer than the cache defeats recency: LRU never hits.
+    """
+    return [position % keys for position in range(length)]
+
+
+def loop_trace(length: int = 100000, keys: int = 10000,
+               seed: int = 0) -> List[int]:
+    """Repeat a loop over a random permutation of ``keys`` keys."""
+    rng = random.Random(seed)
+    loop = list(range(keys))
+    rng.shuffle(loop)
+    return [loop[position % keys] for position in range(length)]
+
+
+def scan_mix_trace(length: int = 200000, hot: int = 5000,
+                   scan: int = 20000, seed: int = 0) -> List[int]:
+    """Build a trace of Zipf hot keys interrupted by sequential scans.
+
+    Args:
+        length (int): The number of accesses.
+        hot (int): The number of distinct hot keys.
+        scan (int): The length of each scan of cold keys.
+        seed (int): The random seed.
+
+    Returns:
+        List[int]: The keys in access order.
+    """
+    rng = random.Random(seed)
+    weights = list(itertools.accumulate(1 / rank for rank in
+                                        range(1, hot + 1)))
+    trace = []
+    cold = itertools.count(hot)
+    while len(trace) < length:
+        trace.extend(rng.choices(range(hot), cum_weights=weights, k=scan))
+        trace.extend(next(cold) for _ in range(scan // 2))
+    return trace[:length]
+
+
+def mix_trace(length: int = 100000, keys: int = 10000,
+              seed: int = 0) -> List[int]:
+    """Zipf hot keys interrupted by scans of never-seen keys."""
+    return scan_mix_trace(length, hot=keys // 2, scan=keys * 2, seed=seed)
+
+
+def read_trace(path: str) -> List[str]:
+    """Read a trace file holding one key per line."""
+    with open(path) as f:
+        return [line.rstrip("\n") for line in f]
+
+
+WORKLOADS: Dict[str, Callable[..., List[int]]] = {
+    "zipf": zipf_trace,
+    "scan": scan_trace,
+    "loop": loop_trace,
+    "mix": mix_trace,
+}